@@ -1,4 +1,5 @@
 from .utils import (
+    landmarks_to_array,
     calculate_hand_size,
     smooth_finger_tips,
     update_state,
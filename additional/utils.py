@@ -1,17 +1,16 @@
 import cv2
 import numpy as np
 
+def landmarks_to_array(landmarks):
+    return np.array([(lm.x, lm.y, lm.z) for lm in landmarks.landmark], dtype=np.float32)
+
 def calculate_hand_size(landmarks):
-    points = np.array([(lm.x, lm.y) for lm in landmarks.landmark])
+    points = landmarks[:, :2]
     return np.linalg.norm(points.max(axis=0) - points.min(axis=0))
 
 def smooth_finger_tips(new_tips, finger_tips_history):
-    smoothed_tips = []
-    for i, tip in enumerate(new_tips):
-        finger_tips_history[i].append(tip)
-        avg_tip = np.mean(finger_tips_history[i], axis=0)
-        smoothed_tips.append((int(avg_tip[0]), int(avg_tip[1])))
-    return smoothed_tips
+    finger_tips_history.append(new_tips)
+    return finger_tips_history.mean().astype(new_tips.dtype)
 
 def update_state(new_state, state_transition, state_transition_threshold):
     for state in state_transition:
@@ -36,15 +35,14 @@ def draw_size_change_graph(image, size_changes):
     return image
 
 def calculate_hand_center(landmarks, width, height):
-    points = np.array([(lm.x * width, lm.y * height) for lm in landmarks.landmark])
-    return np.mean(points, axis=0)
+    return np.mean(landmarks[:, :2], axis=0) * (width, height)
 
 def detect_significant_changes(current_frame, prev_frame, change_threshold):
     if prev_frame is None:
         return False
     
     diff = cv2.absdiff(current_frame, prev_frame)
-    gray_diff = cv2.cvtColor(diff, cv2.COLOR_BGR2GRAY)
+    gray_diff = diff if diff.ndim == 2 else cv2.cvtColor(diff, cv2.COLOR_BGR2GRAY)
     _, threshold = cv2.threshold(gray_diff, 25, 255, cv2.THRESH_BINARY)
     change_percent = (np.sum(threshold) / 255) / (threshold.shape[0] * threshold.shape[1]) * 100
     
@@ -1,2 +1,5 @@
 from .hand_api import HandAPI
-from .surface_api import SurfaceAPI
\ No newline at end of file
+from .surface_api import SurfaceAPI
+from .hand_backends import SolutionsHandsBackend, HandLandmarkerBackend
+from .hand_frame import HandFrame
+from .hand_tracker import HandTracker, HandDetections
\ No newline at end of file
@@ -1,17 +1,22 @@
 import cv2
+import threading
 import mediapipe as mp
 import numpy as np
+from .hand_frame import HandFrame
+from .landmark_predictor import LandmarkPredictor
+from .hand_backends import SolutionsHandsBackend
+from .overlay_layer import OverlayLayer
 
 class HandAPI:
-    def __init__(self, surface_api):
+    def __init__(self, surface_api, load_model=True, roi_tracking=False, detect_every=1, adaptive_detection=False,
+                 backend=None, max_hands=1):
+        if max_hands > 1 and (roi_tracking or detect_every > 1 or adaptive_detection):
+            raise ValueError("ROI tracking and detection decimation follow a single hand; use them with max_hands=1")
         self.mp_hands = mp.solutions.hands
-        self.hands = self.mp_hands.Hands(
-            static_image_mode=False, 
-            max_num_hands=1,
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5,
-            model_complexity=1
-        )
+        self.max_hands = max_hands
+        self.backend = backend
+        if backend is None and load_model:
+            self.backend = SolutionsHandsBackend(max_num_hands=max_hands)
         self.surface_api = surface_api
         self.finger_axis_length = 50  
         self.image_width = 0
@@ -20,10 +25,13 @@ class HandAPI:
         self.show_axes = {name: True for name in self.finger_names}
         self.button_size = (100, 30)
         self.button_margin = 10
+        self.buttons_layer = OverlayLayer()
         
         self.clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
         self.contrast_alpha = 1.2
         self.contrast_beta = 10
+        self.gamma = 1.5
+        self.gamma_lut = ((np.arange(256) / 255.0) ** (1.0 / self.gamma) * 255).astype(np.uint8)
 
         self.landmark_colors = [
             (255, 0, 0), (0, 255, 0), (0, 0, 255), (255, 255, 0), (255, 0, 255),
@@ -44,56 +52,218 @@ class HandAPI:
 
         self.smoothing_factor = 0.25
 
+        self.roi_tracking = roi_tracking
+        self.roi_margin = 0.6
+        self.roi_min_size = 192
+        self.tracking_box = None
+
+        self.detect_every = detect_every
+        self.adaptive_detection = adaptive_detection
+        self.max_detect_interval = 4
+        self.slow_speed = 2.0
+        self.fast_speed = 12.0
+        self.max_predicted_shift = 0.35
+        self.drift_threshold = 18.0
+        self.patch_size = 24
+        self.predictor = LandmarkPredictor()
+        # False when an asynchronous backend has not answered since the previous frame
+        self.new_result = True
+        self.prediction_lock = threading.Lock()
+        self.frames_since_detection = 0
+        self.detection_gap = 1
+        self.pending_prediction_update = False
+        self.reference_patch = None
+        self.reference_box = None
+        self.reference_center = None
+        self.reference_size = None
+
     def preprocess_image(self, image):
+        if image.ndim == 2:
+            return cv2.LUT(self.clahe.apply(image), self.gamma_lut)
+
         lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
         l, a, b = cv2.split(lab)
         l = self.clahe.apply(l)
         lab = cv2.merge((l, a, b))
         image = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
         
-        gamma = 1.5
-        lookup_table = np.array([((i / 255.0) ** (1.0 / gamma)) * 255 for i in np.arange(0, 256)]).astype("uint8")
-        image = cv2.LUT(image, lookup_table)
+        image = cv2.LUT(image, self.gamma_lut)
         
         return image
 
-    def detect_hand(self, image):
+    def detect_hand(self, image, model_input=None):
+        self.new_result = True
+        # with --pipeline the predictor is fed from the gesture thread, so decisions and updates share a lock
+        with self.prediction_lock:
+            if not self.should_detect(image):
+                return self.predict_landmarks()
+
+        box = self.tracking_roi()
+        if model_input is None or box is not None:
+            model_input = self.prepare_input(image, box)
+        hand_landmarks = self.run_inference(model_input, box)
+        if not self.new_result:
+            return None
+        if hand_landmarks is None and box is not None:
+            hand_landmarks = self.run_inference(self.prepare_input(image))
+            # the crop has already answered that the hand left it, even if the full frame is still in flight
+            self.new_result = True
+        with self.prediction_lock:
+            self.remember_detection(image, hand_landmarks)
+        return hand_landmarks
+
+    def decimation_enabled(self):
+        return self.detect_every > 1 or self.adaptive_detection
+
+    def detection_interval(self):
+        if not self.adaptive_detection:
+            return self.detect_every
+        speed = self.predictor.speed(self.image_width, self.image_height)
+        if speed <= self.slow_speed:
+            return self.max_detect_interval
+        if speed >= self.fast_speed:
+            return 1
+        ratio = (self.fast_speed - speed) / (self.fast_speed - self.slow_speed)
+        return max(1, int(round(1 + ratio * (self.max_detect_interval - 1))))
+
+    def should_detect(self, image):
+        if not self.decimation_enabled() or self.predictor.position is None:
+            return True
+
+        self.frames_since_detection += 1
+        if self.frames_since_detection >= self.detection_interval():
+            return True
+
+        predicted = self.predictor.predict(self.frames_since_detection)
+        shift = predicted[:, :2].mean(axis=0) * (self.image_width, self.image_height) - self.reference_center
+        if np.linalg.norm(shift) > self.max_predicted_shift * self.reference_size:
+            return True
+
+        return self.prediction_drifted(image, shift)
+
+    def prediction_drifted(self, image, shift):
+        x0, y0, x1, y1 = self.reference_box
+        dx, dy = int(round(shift[0])), int(round(shift[1]))
+        if x0 + dx < 0 or y0 + dy < 0 or x1 + dx > self.image_width or y1 + dy > self.image_height:
+            return True
+        patch = self.extract_patch(image, (x0 + dx, y0 + dy, x1 + dx, y1 + dy))
+        return float(np.mean(cv2.absdiff(patch, self.reference_patch))) > self.drift_threshold
+
+    def extract_patch(self, image, box):
+        x0, y0, x1, y1 = box
+        patch = image[y0:y1, x0:x1]
+        if patch.ndim == 3:
+            patch = cv2.cvtColor(patch, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(patch, (self.patch_size, self.patch_size), interpolation=cv2.INTER_AREA)
+
+    def remember_detection(self, image, hand_landmarks):
+        if not self.decimation_enabled():
+            return
+        if hand_landmarks is None:
+            self.predictor.reset()
+            self.reference_patch = None
+            self.pending_prediction_update = False
+            return
+
+        points = hand_landmarks[:, :2] * (self.image_width, self.image_height)
+        x_min, y_min = np.floor(points.min(axis=0)).astype(int)
+        x_max, y_max = np.ceil(points.max(axis=0)).astype(int)
+        x0, y0 = max(x_min, 0), max(y_min, 0)
+        x1, y1 = min(x_max, self.image_width), min(y_max, self.image_height)
+        if x1 - x0 < 2 or y1 - y0 < 2:
+            self.predictor.reset()
+            return
+
+        self.reference_box = (x0, y0, x1, y1)
+        self.reference_patch = self.extract_patch(image, self.reference_box)
+        self.reference_center = points.mean(axis=0)
+        self.reference_size = max(x_max - x_min, y_max - y_min)
+        self.detection_gap = max(self.frames_since_detection, 1)
+        self.frames_since_detection = 0
+        self.pending_prediction_update = True
+
+    def predict_landmarks(self):
+        predicted = self.predictor.predict(self.frames_since_detection)
+        if predicted is None:
+            return None
+        return predicted.astype(np.float32)
+
+    def tracking_roi(self):
+        return self.tracking_box if self.roi_tracking else None
+
+    def prepare_input(self, image, box=None):
+        if box is not None:
+            x0, y0, x1, y1 = box
+            image = image[y0:y1, x0:x1]
         preprocessed_image = self.preprocess_image(image)
-        image_rgb = cv2.cvtColor(preprocessed_image, cv2.COLOR_BGR2RGB)
-        results = self.hands.process(image_rgb)
-        
-        if results.multi_hand_landmarks:
-            return results.multi_hand_landmarks[0]
+        if preprocessed_image.ndim == 2:
+            return cv2.cvtColor(preprocessed_image, cv2.COLOR_GRAY2RGB)
+        return cv2.cvtColor(preprocessed_image, cv2.COLOR_BGR2RGB)
+
+    def run_inference(self, image_rgb, box=None):
+        if self.max_hands > 1:
+            # несколько рук: отдаём все детекции, идентичность и сглаживание ведёт HandTracker
+            result = self.backend.process_hands(image_rgb)
+            if result is None:
+                self.new_result = False
+                return None
+            detections, _ = result
+            return detections
+
+        # asynchronous backends may answer with an earlier frame, so the box comes back with the result
+        result = self.backend.process(image_rgb, box)
+        if result is None:
+            self.new_result = False
+            return None
+        hand_landmarks, box = result
+
+        if hand_landmarks is not None:
+            if box is not None:
+                self.map_from_roi(hand_landmarks, box)
+            if self.roi_tracking:
+                self.update_tracking_box(hand_landmarks)
+            return hand_landmarks
         else:
+            self.tracking_box = None
             return None
 
-    def get_hand_info(self, image, hand_landmarks):
-        h, w = image.shape[:2]
-        hand_info = {}
+    def map_from_roi(self, hand_landmarks, box):
+        x0, y0, x1, y1 = box
+        scale_x = (x1 - x0) / self.image_width
+        scale_y = (y1 - y0) / self.image_height
+        hand_landmarks[:, 0] = x0 / self.image_width + hand_landmarks[:, 0] * scale_x
+        hand_landmarks[:, 1] = y0 / self.image_height + hand_landmarks[:, 1] * scale_y
+        # z shares the x scale in MediaPipe's normalization
+        hand_landmarks[:, 2] *= scale_x
+
+    def update_tracking_box(self, hand_landmarks):
+        points = hand_landmarks[:, :2] * (self.image_width, self.image_height)
+        x_min, y_min = points.min(axis=0)
+        x_max, y_max = points.max(axis=0)
 
-        wrist = hand_landmarks.landmark[self.mp_hands.HandLandmark.WRIST]
-        middle_mcp = hand_landmarks.landmark[self.mp_hands.HandLandmark.MIDDLE_FINGER_MCP]
-        if wrist.x < middle_mcp.x:
-            hand_info['label'] = "Left Hand"
+        # keep the crop still while the hand stays well inside it, so the
+        # model's own frame-to-frame tracking sees a stable input
+        if self.tracking_box is not None:
+            x0, y0, x1, y1 = self.tracking_box
+            inset = 0.15 * (x1 - x0)
+            if x_min > x0 + inset and x_max < x1 - inset and y_min > y0 + inset and y_max < y1 - inset:
+                return
+
+        size = max(x_max - x_min, y_max - y_min) * (1 + 2 * self.roi_margin)
+        size = int(min(max(size, self.roi_min_size), self.image_width, self.image_height))
+        center_x = (x_min + x_max) / 2
+        center_y = (y_min + y_max) / 2
+        x0 = int(min(max(center_x - size / 2, 0), self.image_width - size))
+        y0 = int(min(max(center_y - size / 2, 0), self.image_height - size))
+        self.tracking_box = (x0, y0, x0 + size, y0 + size)
+
+    def get_hand_info(self, image, hand_landmarks):
+        if image is not None:
+            h, w = image.shape[:2]
         else:
-            hand_info['label'] = "Right Hand"
-
-        finger_tips = [
-            self.mp_hands.HandLandmark.THUMB_TIP,
-            self.mp_hands.HandLandmark.INDEX_FINGER_TIP,
-            self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP,
-            self.mp_hands.HandLandmark.RING_FINGER_TIP,
-            self.mp_hands.HandLandmark.PINKY_TIP
-        ]
-        finger_bases = [
-            self.mp_hands.HandLandmark.THUMB_MCP,
-            self.mp_hands.HandLandmark.INDEX_FINGER_MCP,
-            self.mp_hands.HandLandmark.MIDDLE_FINGER_MCP,
-            self.mp_hands.HandLandmark.RING_FINGER_MCP,
-            self.mp_hands.HandLandmark.PINKY_MCP
-        ]
+            h, w = self.image_height, self.image_width
 
-        current_landmarks = np.array([[landmark.x, landmark.y, landmark.z] for landmark in hand_landmarks.landmark])
+        current_landmarks = np.asarray(hand_landmarks, dtype=np.float64)
         
         if self.smoothed_landmarks is None:
             self.smoothed_landmarks = current_landmarks
@@ -101,76 +271,40 @@ class HandAPI:
             # Уменьшаем эффект сглаживания
             self.smoothed_landmarks = self.smoothing_factor * self.smoothed_landmarks + (1 - self.smoothing_factor) * current_landmarks
 
-        for i, smoothed in enumerate(self.smoothed_landmarks):
-            hand_landmarks.landmark[i].x = smoothed[0]
-            hand_landmarks.landmark[i].y = smoothed[1]
-            hand_landmarks.landmark[i].z = smoothed[2]
-
-        hand_info['finger_tips'] = []
-        hand_info['finger_directions'] = []
-        hand_info['is_perpendicular'] = []
-        hand_info['is_finger_bent'] = []
-
-        for tip, base in zip(finger_tips, finger_bases):
-            tip_landmark = hand_landmarks.landmark[tip]
-            base_landmark = hand_landmarks.landmark[base]
-            
-            direction = (
-                tip_landmark.x - base_landmark.x,
-                tip_landmark.y - base_landmark.y,
-                tip_landmark.z - base_landmark.z
-            )
-            
-            finger_length = np.sqrt(direction[0]**2 + direction[1]**2 + direction[2]**2)
-            is_finger_bent = finger_length < self.finger_length_threshold
-            
-            norm = np.sqrt(direction[0]**2 + direction[1]**2 + direction[2]**2)
-            if norm != 0:
-                direction = tuple(d / norm for d in direction)
-            
-            is_perpendicular = abs(direction[2]) > self.depth_threshold or is_finger_bent
-            
-            hand_info['finger_tips'].append((int(tip_landmark.x * w), int(tip_landmark.y * h)))
-            hand_info['finger_directions'].append(direction)
-            hand_info['is_perpendicular'].append(is_perpendicular)
-            hand_info['is_finger_bent'].append(is_finger_bent)
-
-        index_mcp = hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_MCP]
-        pinky_mcp = hand_landmarks.landmark[self.mp_hands.HandLandmark.PINKY_MCP]
-        hand_direction = (pinky_mcp.x - index_mcp.x, pinky_mcp.y - index_mcp.y, pinky_mcp.z - index_mcp.z)
-        hand_info['hand_direction'] = hand_direction
-
-        hand_info['landmark_depths'] = [landmark.z for landmark in hand_landmarks.landmark]
-
-        return hand_info
-
-    def draw_hand(self, image, hand_info, hand_landmarks):
-        height, width = image.shape[:2]
+        with self.prediction_lock:
+            if self.pending_prediction_update:
+                self.predictor.update(self.smoothed_landmarks, self.detection_gap)
+                self.pending_prediction_update = False
+
+        return HandFrame(self.smoothed_landmarks, w, h, self.finger_length_threshold, self.depth_threshold)
+
+    def get_tracked_hand_info(self, image, tracker, slot):
+        # landmarks are already smoothed by the tracker, one slot per hand
+        if image is not None:
+            h, w = image.shape[:2]
+        else:
+            h, w = self.image_height, self.image_width
+        return HandFrame(tracker.smoothed[slot], w, h, self.finger_length_threshold, self.depth_threshold)
+
+    def draw_hand(self, image, hand_frame):
+        points = hand_frame.pixel_points().tolist()
         
-        connections = self.mp_hands.HAND_CONNECTIONS
-        for connection in connections:
-            start_idx = connection[0]
-            end_idx = connection[1]
-            start_point = (int(hand_landmarks.landmark[start_idx].x * width),
-                           int(hand_landmarks.landmark[start_idx].y * height))
-            end_point = (int(hand_landmarks.landmark[end_idx].x * width),
-                         int(hand_landmarks.landmark[end_idx].y * height))
-            cv2.line(image, start_point, end_point, (200, 200, 200), 2)
+        for start_idx, end_idx in self.mp_hands.HAND_CONNECTIONS:
+            cv2.line(image, points[start_idx], points[end_idx], (200, 200, 200), 2)
         
-        for i, landmark in enumerate(hand_landmarks.landmark):
-            px, py = int(landmark.x * width), int(landmark.y * height)
-            depth = hand_info['landmark_depths'][i]
-            color = self.get_depth_color(depth)
-            cv2.circle(image, (px, py), 5, color, -1)
+        for point, depth in zip(points, hand_frame.landmark_depths.tolist()):
+            cv2.circle(image, point, 5, self.get_depth_color(depth), -1)
         
-        for i, ((x, y), is_perpendicular, is_bent) in enumerate(zip(hand_info['finger_tips'], hand_info['is_perpendicular'], hand_info['is_finger_bent'])):
+        tips = hand_frame.tip_points()
+        directions = hand_frame.finger_directions.tolist()
+        for i, (tip, is_perpendicular, is_bent) in enumerate(zip(tips, hand_frame.is_perpendicular, hand_frame.is_finger_bent)):
             radius = 8 * (self.perpendicular_adjustment if is_perpendicular else 1)
             color = (0, 0, 255) if is_bent else self.landmark_colors[i]
-            cv2.circle(image, (x, y), int(radius), color, -1)
+            cv2.circle(image, tip, int(radius), color, -1)
             if self.show_axes[self.finger_names[i]]:
-                self.draw_finger_axes(image, (x, y), hand_info['finger_directions'][i])
+                self.draw_finger_axes(image, tip, directions[i])
 
-        cv2.putText(image, hand_info['label'], (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+        cv2.putText(image, hand_frame.label, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
 
         return image
 
@@ -198,6 +332,14 @@ class HandAPI:
                               int(tip[1] - self.finger_axis_length * 0.5 * (direction[1] + ortho[1]))), (100, 100, 100), 2)
 
     def draw_finger_buttons(self, image):
+        # кнопки меняются только по клику, так что рисуем их в слой и дальше только накладываем
+        key = (tuple(self.show_axes[finger] for finger in self.finger_names), self.button_size, self.button_margin,
+               self.image_height, image.shape[:2])
+        if not self.buttons_layer.is_current(key):
+            self.buttons_layer.render(key, image.shape[0], image.shape[1], self.draw_finger_buttons_at)
+        self.buttons_layer.composite(image)
+
+    def draw_finger_buttons_at(self, image):
         for i, finger in enumerate(self.finger_names):
             x = self.button_margin + i * (self.button_size[0] + self.button_margin)
             y = self.image_height - self.button_size[1] - self.button_margin
@@ -0,0 +1,152 @@
+import os
+import threading
+import time
+import numpy as np
+import mediapipe as mp
+from additional.utils import landmarks_to_array
+from .hand_tracker import HandDetections, HANDEDNESS, UNKNOWN_HANDEDNESS
+
+LANDMARKER_MODEL_URL = 'https://storage.googleapis.com/mediapipe-models/hand_landmarker/hand_landmarker/float16/1/hand_landmarker.task'
+
+class SolutionsHandsBackend:
+    def __init__(self, max_num_hands=1, min_detection_confidence=0.5, min_tracking_confidence=0.5, model_complexity=1):
+        self.hands = mp.solutions.hands.Hands(
+            static_image_mode=False,
+            max_num_hands=max_num_hands,
+            min_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            model_complexity=model_complexity
+        )
+
+    def process(self, image_rgb, context=None, timestamp=None):
+        results = self.hands.process(image_rgb)
+        if results.multi_hand_landmarks:
+            return landmarks_to_array(results.multi_hand_landmarks[0]), context
+        return None, context
+
+    def process_hands(self, image_rgb, context=None, timestamp=None):
+        results = self.hands.process(image_rgb)
+        if not results.multi_hand_landmarks:
+            return None, context
+        landmarks = np.stack([landmarks_to_array(hand) for hand in results.multi_hand_landmarks])
+        handedness = np.array([HANDEDNESS.get(hand.classification[0].label, UNKNOWN_HANDEDNESS)
+                               for hand in results.multi_handedness], dtype=np.int8)
+        return HandDetections(landmarks, handedness), context
+
+    def close(self):
+        self.hands.close()
+
+class HandLandmarkerBackend:
+    def __init__(self, model_path, num_hands=1, delegate='cpu', max_in_flight=2, result_timeout=0.5,
+                 min_detection_confidence=0.5, min_presence_confidence=0.5, min_tracking_confidence=0.5):
+        from mediapipe.tasks.python import BaseOptions
+        from mediapipe.tasks.python import vision
+
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"Hand landmarker model not found: {model_path} (download it from {LANDMARKER_MODEL_URL})")
+
+        delegates = {'cpu': BaseOptions.Delegate.CPU, 'gpu': BaseOptions.Delegate.GPU}
+        options = vision.HandLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path, delegate=delegates[delegate]),
+            running_mode=vision.RunningMode.LIVE_STREAM,
+            num_hands=num_hands,
+            min_hand_detection_confidence=min_detection_confidence,
+            min_hand_presence_confidence=min_presence_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+            result_callback=self._on_result
+        )
+        self.landmarker = vision.HandLandmarker.create_from_options(options)
+
+        self.max_in_flight = max_in_flight
+        self.result_timeout = result_timeout
+        self.lock = threading.Lock()
+        self.pending = {}
+        self.last_timestamp_ms = -1
+        self.latest_landmarks = None
+        self.latest_detections = None
+        self.latest_context = None
+        self.latest_timestamp_ms = None
+        self.results_received = 0
+        self.results_taken = 0
+        self.frames_skipped = 0
+        self.on_result = None
+
+    def next_timestamp_ms(self, timestamp):
+        timestamp_ms = int((timestamp if timestamp is not None else time.monotonic()) * 1000)
+        # detect_async requires strictly increasing timestamps
+        timestamp_ms = max(timestamp_ms, self.last_timestamp_ms + 1)
+        self.last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+
+    def submit(self, image_rgb, context, timestamp):
+        with self.lock:
+            now = time.monotonic()
+            for submitted_ms, (_, submitted_at) in list(self.pending.items()):
+                if now - submitted_at > self.result_timeout:
+                    del self.pending[submitted_ms]
+            busy = len(self.pending) >= self.max_in_flight
+
+        if busy:
+            self.frames_skipped += 1
+            return
+        timestamp_ms = self.next_timestamp_ms(timestamp)
+        with self.lock:
+            self.pending[timestamp_ms] = (context, time.monotonic())
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(image_rgb))
+        self.landmarker.detect_async(image, timestamp_ms)
+
+    def process(self, image_rgb, context=None, timestamp=None):
+        # None, not (None, context): no callback since the last call, so there is nothing new to report
+        self.submit(image_rgb, context, timestamp)
+        with self.lock:
+            if self.results_taken == self.results_received:
+                return None
+            self.results_taken = self.results_received
+            if self.latest_landmarks is None:
+                return None, self.latest_context
+            return self.latest_landmarks.copy(), self.latest_context
+
+    def process_hands(self, image_rgb, context=None, timestamp=None):
+        self.submit(image_rgb, context, timestamp)
+        with self.lock:
+            if self.results_taken == self.results_received:
+                return None
+            self.results_taken = self.results_received
+            detections = self.latest_detections
+            if detections is None:
+                return None, self.latest_context
+            return HandDetections(detections.landmarks.copy(), detections.handedness), self.latest_context
+
+    def latest(self):
+        with self.lock:
+            if self.latest_landmarks is None:
+                return None, self.latest_context
+            return self.latest_landmarks.copy(), self.latest_context
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        landmarks = None
+        detections = None
+        if result.hand_landmarks:
+            all_landmarks = np.array([[(lm.x, lm.y, lm.z) for lm in hand] for hand in result.hand_landmarks],
+                                     dtype=np.float32)
+            handedness = np.array([HANDEDNESS.get(hand[0].category_name, UNKNOWN_HANDEDNESS)
+                                   for hand in result.handedness], dtype=np.int8)
+            landmarks = all_landmarks[0]
+            detections = HandDetections(all_landmarks, handedness)
+
+        with self.lock:
+            context, _ = self.pending.pop(timestamp_ms, (None, None))
+            # frames the landmarker dropped never get a callback
+            for submitted_ms in [ms for ms in self.pending if ms < timestamp_ms]:
+                del self.pending[submitted_ms]
+            self.latest_landmarks = landmarks
+            self.latest_detections = detections
+            self.latest_context = context
+            self.latest_timestamp_ms = timestamp_ms
+            self.results_received += 1
+
+        if self.on_result is not None:
+            self.on_result(landmarks, timestamp_ms)
+
+    def close(self):
+        self.landmarker.close()
@@ -0,0 +1,45 @@
+import numpy as np
+from additional.utils import calculate_hand_size, calculate_hand_center
+
+WRIST = 0
+INDEX_FINGER_MCP = 5
+MIDDLE_FINGER_MCP = 9
+PINKY_MCP = 17
+FINGER_TIPS = np.array([4, 8, 12, 16, 20])
+FINGER_BASES = np.array([2, 5, 9, 13, 17])
+
+class HandFrame:
+    __slots__ = ('landmarks', 'width', 'height', 'label', 'finger_tips', 'finger_directions',
+                 'is_perpendicular', 'is_finger_bent', 'hand_direction', 'size', 'center')
+
+    def __init__(self, landmarks, width, height, finger_length_threshold=0.08, depth_threshold=0.03):
+        self.landmarks = landmarks
+        self.width = width
+        self.height = height
+
+        if landmarks[WRIST, 0] < landmarks[MIDDLE_FINGER_MCP, 0]:
+            self.label = "Left Hand"
+        else:
+            self.label = "Right Hand"
+
+        directions = landmarks[FINGER_TIPS] - landmarks[FINGER_BASES]
+        lengths = np.linalg.norm(directions, axis=1)
+        self.is_finger_bent = lengths < finger_length_threshold
+        self.finger_directions = directions / np.where(lengths == 0, 1, lengths)[:, None]
+        self.is_perpendicular = (np.abs(self.finger_directions[:, 2]) > depth_threshold) | self.is_finger_bent
+
+        self.finger_tips = (landmarks[FINGER_TIPS, :2] * (width, height)).astype(np.int32)
+        self.hand_direction = landmarks[PINKY_MCP] - landmarks[INDEX_FINGER_MCP]
+        self.size = calculate_hand_size(landmarks)
+        self.center = calculate_hand_center(landmarks, width, height)
+
+    @property
+    def landmark_depths(self):
+        return self.landmarks[:, 2]
+
+    def pixel_points(self):
+        return (self.landmarks[:, :2] * (self.width, self.height)).astype(np.int32)
+
+    def tip_points(self):
+        # cv2 point arguments need plain python ints
+        return [tuple(tip) for tip in self.finger_tips.tolist()]
@@ -0,0 +1,125 @@
+import numpy as np
+
+LEFT = 0
+RIGHT = 1
+UNKNOWN_HANDEDNESS = -1
+HANDEDNESS = {'Left': LEFT, 'Right': RIGHT}
+
+class HandDetections:
+    # every hand the model found in one frame, in model order
+    __slots__ = ('landmarks', 'handedness')
+
+    def __init__(self, landmarks, handedness):
+        self.landmarks = landmarks
+        self.handedness = handedness
+
+    def __len__(self):
+        return len(self.landmarks)
+
+class HandTracker:
+    # a fixed number of slots allocated up front; matching, smoothing and aging are array ops over all slots
+    def __init__(self, max_hands=2, smoothing_factor=0.25, match_distance=0.2, handedness_penalty=0.1,
+                 max_missed=5):
+        self.max_hands = max_hands
+        self.smoothing_factor = smoothing_factor
+        self.match_distance = match_distance
+        self.handedness_penalty = handedness_penalty
+        self.max_missed = max_missed
+
+        self.active = np.zeros(max_hands, dtype=bool)
+        self.seen = np.zeros(max_hands, dtype=bool)
+        self.started = np.zeros(max_hands, dtype=bool)
+        self.released = np.zeros(max_hands, dtype=bool)
+        self.ids = np.full(max_hands, -1, dtype=np.int64)
+        self.handedness = np.full(max_hands, UNKNOWN_HANDEDNESS, dtype=np.int8)
+        self.missed = np.zeros(max_hands, dtype=np.int32)
+        self.smoothed = np.zeros((max_hands, 21, 3))
+        self.centers = np.zeros((max_hands, 2))
+        self.next_id = 0
+
+        self._cost = np.empty((max_hands, max_hands))
+        self._mismatch = np.empty((max_hands, max_hands), dtype=bool)
+        self._detection_centers = np.empty((max_hands, 2))
+        self._assigned = np.empty(max_hands, dtype=np.intp)
+
+    def update(self, detections):
+        self.seen[:] = False
+        self.started[:] = False
+        self.released[:] = False
+
+        count = 0 if detections is None else min(len(detections), self.max_hands)
+        if count:
+            self._match(detections, count)
+
+        missing = self.active & ~self.seen
+        self.missed[missing] += 1
+        lost = missing & (self.missed > self.max_missed)
+        self.active[lost] = False
+        self.ids[lost] = -1
+        self.missed[lost] = 0
+        self.released[lost] = True
+        return self
+
+    def _match(self, detections, count):
+        landmarks = detections.landmarks[:count]
+        handedness = detections.handedness[:count]
+        centers = self._detection_centers[:count]
+        np.mean(landmarks[:, :, :2], axis=1, out=centers)
+
+        # расстояние между центрами кисти в нормированных координатах плюс штраф за другую руку
+        cost = self._cost[:, :count]
+        np.hypot(self.centers[:, None, 0] - centers[None, :, 0], self.centers[:, None, 1] - centers[None, :, 1],
+                 out=cost)
+        mismatch = self._mismatch[:, :count]
+        np.not_equal(self.handedness[:, None], handedness[None, :], out=mismatch)
+        cost += self.handedness_penalty * mismatch
+        cost[~self.active] = np.inf
+        cost[cost > self.match_distance] = np.inf
+
+        assigned = self._assigned[:count]
+        assigned[:] = -1
+        # greedy by distance: with a handful of hands this is the optimal assignment in practice
+        for flat in np.argsort(cost, axis=None).tolist():
+            slot, detection = divmod(flat, count)
+            if cost[slot, detection] == np.inf:
+                break
+            if self.seen[slot] or assigned[detection] >= 0:
+                continue
+            assigned[detection] = slot
+            self.seen[slot] = True
+
+        # new hands take free slots; if every slot still holds a missing hand, they wait until it ages out
+        new_detections = np.flatnonzero(assigned < 0)
+        free_slots = np.flatnonzero(~self.active)
+        for detection, slot in zip(new_detections.tolist(), free_slots.tolist()):
+            assigned[detection] = slot
+            self.ids[slot] = self.next_id
+            self.next_id += 1
+            self.active[slot] = True
+            self.seen[slot] = True
+            self.started[slot] = True
+
+        matched = assigned >= 0
+        slots = assigned[matched]
+        current = landmarks[matched]
+        previous = self.smoothed[slots]
+        fresh = self.started[slots][:, None, None]
+        self.smoothed[slots] = np.where(fresh, current,
+                                        self.smoothing_factor * previous + (1 - self.smoothing_factor) * current)
+        self.centers[slots] = centers[matched]
+        self.handedness[slots] = handedness[matched]
+        self.missed[slots] = 0
+
+    def visible_slots(self):
+        # hands seen in the last update, the longest-tracked first
+        slots = np.flatnonzero(self.seen)
+        return slots[np.argsort(self.ids[slots])].tolist()
+
+    def clear(self):
+        self.active[:] = False
+        self.seen[:] = False
+        self.started[:] = False
+        self.released[:] = False
+        self.ids[:] = -1
+        self.handedness[:] = UNKNOWN_HANDEDNESS
+        self.missed[:] = 0
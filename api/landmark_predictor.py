@@ -0,0 +1,36 @@
+import numpy as np
+
+class LandmarkPredictor:
+    # alpha-beta filter: the steady-state Kalman filter of a constant-velocity model
+    def __init__(self, alpha=0.85, beta=0.3):
+        self.alpha = alpha
+        self.beta = beta
+        self.position = None
+        self.velocity = None
+
+    def update(self, landmarks, steps=1):
+        landmarks = np.asarray(landmarks, dtype=np.float64)
+        steps = max(steps, 1)
+        if self.position is None:
+            self.position = landmarks.copy()
+            self.velocity = np.zeros_like(landmarks)
+        else:
+            predicted = self.position + self.velocity * steps
+            residual = landmarks - predicted
+            self.position = predicted + self.alpha * residual
+            self.velocity += (self.beta / steps) * residual
+
+    def predict(self, steps):
+        if self.position is None:
+            return None
+        return self.position + self.velocity * steps
+
+    def speed(self, width, height):
+        if self.velocity is None:
+            return 0.0
+        centroid_velocity = self.velocity[:, :2].mean(axis=0) * (width, height)
+        return float(np.linalg.norm(centroid_velocity))
+
+    def reset(self):
+        self.position = None
+        self.velocity = None
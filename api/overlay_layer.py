@@ -0,0 +1,83 @@
+import cv2
+import numpy as np
+
+class OverlayLayer:
+    # a pre-rendered patch redrawn only when its key changes. text is antialiased, so the layer is drawn once
+    # on black and once on white: fully opaque pixels are copied through a mask, only the soft edges get blended
+    def __init__(self):
+        self.key = None
+        self.patch = None
+        self.opaque = None
+        self.edges = None
+        self.origin = (0, 0)
+        self.placement = None
+
+    def is_current(self, key):
+        return self.patch is not None and self.key == key
+
+    def render(self, key, height, width, draw):
+        on_black = np.zeros((height, width, 3), dtype=np.uint8)
+        on_white = np.full((height, width, 3), 255, dtype=np.uint8)
+        draw(on_black)
+        draw(on_white)
+        # on_black = цвет * альфа, on_white - on_black = 255 * (1 - альфа)
+        transparency = cv2.subtract(on_white, on_black)
+        covered = transparency.min(axis=2) < 255
+
+        x, y, w, h = cv2.boundingRect(covered.astype(np.uint8))
+        box = (slice(y, y + h), slice(x, x + w))
+        self.patch = on_black[box].copy()
+        self.opaque = (transparency[box].max(axis=2) == 0).astype(np.uint8)
+        # мягкие края храним поканально, чтобы смешивать их одним take/put по плоскому кадру
+        ys, xs = np.nonzero(covered[box] & (self.opaque == 0))
+        channels = np.arange(3)
+        self.edges = (np.repeat(ys, 3), np.repeat(xs, 3), np.tile(channels, len(ys)),
+                      self.patch[ys, xs].astype(np.uint16).ravel(), transparency[box][ys, xs].astype(np.uint16).ravel())
+        self.origin = (x, y)
+        self.placement = None
+        self.key = key
+
+    def composite(self, image, offset=(0, 0)):
+        if self.patch is None:
+            return
+        h, w = self.patch.shape[:2]
+        x0 = self.origin[0] + offset[0]
+        y0 = self.origin[1] + offset[1]
+        ix0, iy0 = max(x0, 0), max(y0, 0)
+        ix1, iy1 = min(x0 + w, image.shape[1]), min(y0 + h, image.shape[0])
+        if ix0 >= ix1 or iy0 >= iy1:
+            return
+
+        patch_box = (slice(iy0 - y0, iy1 - y0), slice(ix0 - x0, ix1 - x0))
+        cv2.copyTo(self.patch[patch_box], self.opaque[patch_box], image[iy0:iy1, ix0:ix1])
+
+        placement = (image.shape, x0, y0)
+        if self.placement is None or self.placement[0] != placement:
+            ys, xs, channels, colors, transparency = self.edges
+            ys = ys + y0
+            xs = xs + x0
+            if ix0 != x0 or iy0 != y0 or ix1 != x0 + w or iy1 != y0 + h:
+                inside = (ys >= iy0) & (ys < iy1) & (xs >= ix0) & (xs < ix1)
+                ys, xs, channels, colors, transparency = (ys[inside], xs[inside], channels[inside], colors[inside],
+                                                          transparency[inside])
+            indices = (ys * image.shape[1] + xs) * 3 + channels
+            self.placement = (placement, (ys, xs, channels), indices, colors, transparency)
+
+        _, pixels, indices, colors, transparency = self.placement
+        flat = image.reshape(-1) if image.flags.c_contiguous else None
+        blended = (flat.take(indices) if flat is not None else image[pixels]).astype(np.uint16)
+        blended *= transparency
+        blended += 127
+        blended //= 255
+        blended += colors
+        if flat is not None:
+            flat[indices] = blended
+        else:
+            image[pixels] = blended
+
+    def clear(self):
+        self.key = None
+        self.patch = None
+        self.opaque = None
+        self.edges = None
+        self.placement = None
@@ -1,6 +1,7 @@
 import cv2
 import numpy as np
 import time
+from .overlay_layer import OverlayLayer
 
 class SurfaceAPI:
     def __init__(self, highlight_color=(0, 255, 0, 0.05)):
@@ -16,6 +17,15 @@ class SurfaceAPI:
         self.surface_stability_threshold = 2
         self.previous_surface_contour = None
         self.prev_frame = None
+        # общий анализатор движения от VideoProcessor; без него update сравнивает полные кадры сам
+        self.motion = None
+
+        # поиск поверхности: раз в detect_every кадров, на кадре уменьшенном в detection_scale раз
+        self.detect_every = 1
+        self.detection_scale = 1.0
+        # если изменилось меньше этого процента кадра, контур считаем прежним и не ищем заново
+        self.still_change_percent = 0.5
+        self.detection_counter = 0
         self.is_clicking = False
         self.click_cooldown = 10
         self.click_counter = 0
@@ -27,7 +37,11 @@ class SurfaceAPI:
         self.closest_ring = None
         self.closest_half = None
         self.rings = []
+        self.ring_centers = []
         self.ring_halves = {}  
+        # кольца считаются один раз для зафиксированной поверхности и сбрасываются при разблокировке
+        self.ring_cache = None
+        self.ring_maps = None
 
         self.prev_finger_position = None
         self.prev_palm_size = None
@@ -43,6 +57,24 @@ class SurfaceAPI:
         self.extended_lock_active = False  
         self.return_message_time = None
         self.return_message_duration = 1.5
+        self.show_return_message = False
+
+        # заранее отрисованные слои: оси, контур с кольцами и заливка зафиксированной поверхности
+        self.axes_layer = OverlayLayer()
+        self.surface_layer = OverlayLayer()
+        self.fill_cache = None
+        self.geometry_version = 0
+
+    @property
+    def is_surface_locked(self):
+        return self.surface_locked
+
+    @is_surface_locked.setter
+    def is_surface_locked(self, locked):
+        if not locked:
+            self.ring_cache = None
+            self.ring_maps = None
+        self.surface_locked = locked
 
     def detect_surface(self, image):
         if self.got_it_time and time.time() - self.got_it_time <= self.lock_duration:
@@ -51,12 +83,23 @@ class SurfaceAPI:
         if self.is_surface_locked:
             return
 
+        if self.surface_contour is not None:
+            self.detection_counter += 1
+            if self.detection_counter % self.detect_every != 0:
+                return
+            if self.is_scene_still():
+                self.advance_lock_timer()
+                return
+
         height, width = image.shape[:2]
         lower_bound = int(height * 0.4) 
 
         roi = image[lower_bound:, :]
+        scale = self.detection_scale
+        if scale != 1.0:
+            roi = cv2.resize(roi, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
 
-        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        gray = roi if roi.ndim == 2 else cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
         blur = cv2.GaussianBlur(gray, (5, 5), 0)
         _, thresh = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
         
@@ -64,10 +107,14 @@ class SurfaceAPI:
         
         if contours:
             largest_contour = max(contours, key=cv2.contourArea)
-            area = cv2.contourArea(largest_contour)
+            area = cv2.contourArea(largest_contour) / (scale * scale)
             if area > 1000: 
                 self.surface_color = np.mean(roi[largest_contour[:,:,1], largest_contour[:,:,0]])
-                new_surface_contour = largest_contour
+                if scale != 1.0:
+                    # контур обратно в координаты полного кадра
+                    new_surface_contour = (largest_contour / scale).astype(np.int32)
+                else:
+                    new_surface_contour = largest_contour
 
                 new_surface_contour[:,:,1] += lower_bound
 
@@ -90,13 +137,28 @@ class SurfaceAPI:
         else:
             self.reset_surface()
 
+    def is_scene_still(self):
+        motion = self.motion
+        return motion is not None and motion.has_previous and motion.change_percent < self.still_change_percent
+
+    def advance_lock_timer(self):
+        # кадр без движения даёт тот же контур, поэтому считаем его совпавшим и отсчёт до фиксации идёт дальше
+        current_time = time.time()
+        if self.last_surface_update is None:
+            self.last_surface_update = current_time
+        elif current_time - self.last_surface_update >= self.surface_stability_threshold:
+            self.is_surface_locked = True
+
     def reset_surface(self):
         self.surface_color = None
         self.surface_contour = None
         self.previous_surface_contour = None
         self.last_surface_update = None
         self.rings = []
+        self.ring_centers = []
         self.ring_halves = {}
+        self.ring_cache = None
+        self.ring_maps = None
 
     def update_center(self, finger_position):
         if self.is_surface_locked and self.surface_contour is not None:
@@ -115,12 +177,8 @@ class SurfaceAPI:
             cv2.rectangle(image, (width-50, height-50), (width-10, height-10), (gray_color, gray_color, gray_color), -1)
             
             if self.surface_contour is not None:
-                overlay = image.copy()
-                cv2.drawContours(overlay, [self.surface_contour], 0, (0, 255, 0), -1)
-                cv2.addWeighted(overlay, 0.3, image, 0.7, 0, image)
-                cv2.drawContours(image, [self.surface_contour], 0, (0, 255, 0), 2)
-
-                self.draw_inner_rings(image, self.surface_contour)
+                self.draw_surface_fill(image)
+                self.draw_surface_lines(image)
 
                 if self.is_surface_locked and self.center:
                     self.highlight_closest_ring_half(image, self.center, None)
@@ -129,51 +187,142 @@ class SurfaceAPI:
         
         return image
 
+    def update_overlay_state(self, shape):
+        # то же, что highlight_surface делает помимо рисования — для кадров, которые не показываются
+        if self.surface_color is not None and self.surface_contour is not None:
+            self.get_ring_geometry(self.surface_contour)
+            if self.is_surface_locked and self.center:
+                self.update_ring_half(self.center, None, shape)
+
+    def locked_geometry_key(self, shape):
+        if not self.is_surface_locked:
+            return None
+        cache = self.get_ring_geometry(self.surface_contour)
+        if cache is None:
+            return None
+        return (cache['version'], shape[:2])
+
+    def draw_surface_fill(self, image):
+        key = self.locked_geometry_key(image.shape)
+        if key is None:
+            overlay = image.copy()
+            cv2.drawContours(overlay, [self.surface_contour], 0, (0, 255, 0), -1)
+            cv2.addWeighted(overlay, 0.3, image, 0.7, 0, image)
+            return
+
+        if self.fill_cache is None or self.fill_cache[0] != key:
+            mask = np.zeros(image.shape[:2], dtype=np.uint8)
+            cv2.drawContours(mask, [self.surface_contour], 0, 255, -1)
+            x, y, w, h = cv2.boundingRect(mask)
+            box = (slice(y, y + h), slice(x, x + w))
+            green = np.zeros((h, w) + image.shape[2:], dtype=np.uint8)
+            green[:] = (0, 255, 0)
+            self.fill_cache = (key, box, mask[box], green)
+
+        _, box, mask, green = self.fill_cache
+        roi = image[box]
+        cv2.copyTo(cv2.addWeighted(green, 0.3, roi, 0.7, 0), mask, roi)
+
+    def draw_surface_lines(self, image):
+        key = self.locked_geometry_key(image.shape)
+        if key is None:
+            cv2.drawContours(image, [self.surface_contour], 0, (0, 255, 0), 2)
+            self.draw_inner_rings(image, self.surface_contour)
+            return
+
+        if not self.surface_layer.is_current(key):
+            def draw(canvas):
+                cv2.drawContours(canvas, [self.surface_contour], 0, (0, 255, 0), 2)
+                self.draw_inner_rings(canvas, self.surface_contour)
+
+            self.surface_layer.render(key, image.shape[0], image.shape[1], draw)
+        self.surface_layer.composite(image)
+
     def draw_inner_rings(self, image, contour):
-        M = cv2.moments(contour)
-        if M["m00"] != 0:
-            cX = int(M["m10"] / M["m00"])
-            cY = int(M["m01"] / M["m00"])
-        else:
+        cache = self.get_ring_geometry(contour)
+        if cache is None:
             return
 
-        max_dist = max([cv2.pointPolygonTest(contour, (cX, cY), True) for point in contour[:, 0]])
+        cv2.drawContours(image, self.rings, -1, (0, 255, 0), 2)
+        for text, position in cache['labels']:
+            cv2.putText(image, text, position, cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
 
-        self.rings = []
-        self.ring_halves = {}
+    def get_ring_geometry(self, contour):
+        cache = self.ring_cache
+        if cache is not None and cache['contour'] is contour:
+            self.rings = cache['rings']
+            self.ring_centers = cache['ring_centers']
+            self.ring_halves = cache['ring_halves']
+            return cache
+
+        cache = self.build_ring_geometry(contour)
+        # пока поверхность не зафиксирована, контур меняется каждый кадр — кэшировать нечего
+        self.ring_cache = cache if self.is_surface_locked else None
+        return cache
+
+    def build_ring_geometry(self, contour):
+        M = cv2.moments(contour)
+        if M["m00"] == 0:
+            self.rings = []
+            self.ring_centers = []
+            self.ring_halves = {}
+            return None
+        cX = int(M["m10"] / M["m00"])
+        cY = int(M["m01"] / M["m00"])
+
+        # расстояние от центра до края контура, одно и то же для всех колец
+        max_dist = cv2.pointPolygonTest(contour, (cX, cY), True)
+
+        points = contour[:, 0].astype(np.float64)
+        center = np.array([cX, cY], dtype=np.float64)
+        offsets = points - center
+
+        rings = []
+        ring_halves = {}
+        ring_centers = []
+        labels = []
         for i in range(self.num_rings + 1):
             scale = 1 - (i / (self.num_rings + 1))
-            scaled_contour = np.array([[(p[0][0] - cX) * scale + cX, (p[0][1] - cY) * scale + cY] for p in contour])
-            scaled_contour = scaled_contour.astype(np.int32)
-            self.rings.append(scaled_contour)
-            cv2.drawContours(image, [scaled_contour], 0, (0, 255, 0), 2)
+            scaled_contour = (offsets * scale + center).astype(np.int32)
+            rings.append(scaled_contour)
+
+            ring_moments = cv2.moments(scaled_contour)
+            if ring_moments["m00"] != 0:
+                ring_centers.append((int(ring_moments["m10"] / ring_moments["m00"]),
+                                     int(ring_moments["m01"] / ring_moments["m00"])))
+            else:
+                ring_centers.append(None)
 
             upper_half = f"{i+1}U"
             lower_half = f"{i+1}L"
-            self.ring_halves[upper_half] = (scaled_contour, "upper")
-            self.ring_halves[lower_half] = (scaled_contour, "lower")
-
-            cv2.putText(image, upper_half, (cX - 20, cY - int(max_dist * scale) - 10), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
-            cv2.putText(image, lower_half, (cX - 20, cY + int(max_dist * scale) + 20), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
-                     
+            ring_halves[upper_half] = (scaled_contour, "upper")
+            ring_halves[lower_half] = (scaled_contour, "lower")
+            labels.append((upper_half, (cX - 20, cY - int(max_dist * scale) - 10)))
+            labels.append((lower_half, (cX - 20, cY + int(max_dist * scale) + 20)))
+
+        self.rings = rings
+        self.ring_centers = ring_centers
+        self.ring_halves = ring_halves
+        self.geometry_version += 1
+        return {'contour': contour, 'rings': rings, 'ring_centers': ring_centers, 'ring_halves': ring_halves,
+                'center': (cX, cY), 'max_dist': max_dist, 'labels': labels, 'version': self.geometry_version}
+
     def highlight_closest_ring_half(self, image, finger_position, palm_size):
+        if not self.rings:
+            return
+        self.update_ring_half(finger_position, palm_size, image.shape)
+        self.draw_ring_half(image)
+
+    def update_ring_half(self, finger_position, palm_size, shape):
         if not self.rings:
             return
 
         current_time = time.time()
 
+        self.show_return_message = False
         if self.return_message_time is not None:
             if current_time - self.return_message_time <= self.return_message_duration:
-                text = "finger returned to the surface"
-                font = cv2.FONT_HERSHEY_SIMPLEX
-                font_scale = 1
-                thickness = 2
-                text_size = cv2.getTextSize(text, font, font_scale, thickness)[0]
-                text_x = image.shape[1] - text_size[0] - 20
-                text_y = text_size[1] + 30
-                cv2.putText(image, text, (text_x, text_y), font, font_scale, (0, 255, 0), thickness)
+                self.show_return_message = True
             else:
                 self.return_message_time = None
 
@@ -187,14 +336,12 @@ class SurfaceAPI:
 
                 if (finger_movement_down > self.y_movement_threshold and 
                     palm_size_change < self.palm_size_stability_threshold):
-                    for ring in self.rings:
-                        if cv2.pointPolygonTest(ring, finger_position, False) >= 0:
-                            self.got_it_time = None
-                            self.locked_half = None
-                            self.crossed_ring = False
-                            self.extended_lock_active = False
-                            self.return_message_time = current_time
-                            break
+                    if self.is_inside_rings(finger_position, shape):
+                        self.got_it_time = None
+                        self.locked_half = None
+                        self.crossed_ring = False
+                        self.extended_lock_active = False
+                        self.return_message_time = current_time
 
         if self.got_it_time:
             if self.crossed_ring and not self.extended_lock_active and current_time - self.got_it_time <= self.initial_lock_duration:
@@ -220,58 +367,33 @@ class SurfaceAPI:
 
                 if (finger_movement_up > self.y_movement_threshold and 
                     palm_size_change < self.palm_size_stability_threshold):
-                    if self.locked_half is None:
-                        for ring in self.rings:
-                            if cv2.pointPolygonTest(ring, finger_position, False) >= 0:
-                                self.locked_half = self.closest_half
-                                self.locked_half_time = current_time
-                                self.got_it_time = current_time 
-                                self.crossed_ring = True
-                                break
+                    if self.locked_half is None and self.is_inside_rings(finger_position, shape):
+                        self.locked_half = self.closest_half
+                        self.locked_half_time = current_time
+                        self.got_it_time = current_time 
+                        self.crossed_ring = True
 
             if self.locked_half is None:
-                distances = [cv2.pointPolygonTest(ring, finger_position, True) for ring in self.rings]
-                self.closest_ring = np.argmin(np.abs(distances))
-
-                ring = self.rings[self.closest_ring]
-                M = cv2.moments(ring)
-                if M["m00"] != 0:
-                    cX = int(M["m10"] / M["m00"])
-                    cY = int(M["m01"] / M["m00"])
-                    half = "upper" if finger_position[1] < cY else "lower"
-                    self.closest_half = f"{self.closest_ring + 1}{'U' if half == 'upper' else 'L'}"
+                closest_half = self.find_closest_half(finger_position, shape)
+                if closest_half is not None:
+                    self.closest_half = closest_half
 
-                is_inside = cv2.pointPolygonTest(ring, finger_position, False) >= 0
-                ring_number, half_type = int(self.closest_half[:-1]), self.closest_half[-1]
+        self.prev_finger_position = finger_position
+        self.prev_palm_size = palm_size
 
-                if is_inside and half_type == 'L':
-                    new_ring_number = min(self.num_rings + 1, ring_number + 1)
-                    self.closest_half = f"{new_ring_number}L"
-                elif not is_inside and half_type == 'U':
-                    new_ring_number = max(1, ring_number - 1)
-                    self.closest_half = f"{new_ring_number}U"
+    def draw_ring_half(self, image):
+        if self.show_return_message:
+            text = "finger returned to the surface"
+            font = cv2.FONT_HERSHEY_SIMPLEX
+            font_scale = 1
+            thickness = 2
+            text_size = cv2.getTextSize(text, font, font_scale, thickness)[0]
+            text_x = image.shape[1] - text_size[0] - 20
+            text_y = text_size[1] + 30
+            cv2.putText(image, text, (text_x, text_y), font, font_scale, (0, 255, 0), thickness)
 
         if self.closest_half:
-            ring, half = self.ring_halves[self.closest_half]
-            M = cv2.moments(ring)
-            if M["m00"] != 0:
-                cX = int(M["m10"] / M["m00"])
-                cY = int(M["m01"] / M["m00"])
-
-            mask = np.zeros(image.shape[:2], dtype=np.uint8)
-            cv2.drawContours(mask, [ring], 0, 255, -1)
-            if half == "upper":
-                mask[cY:, :] = 0
-            else:
-                mask[:cY, :] = 0
-
-            red_overlay = np.zeros_like(image)
-            red_overlay[mask == 255] = (0, 0, 255)
-
-            cv2.addWeighted(image, 1, red_overlay, 0.5, 0, image)
-
-            contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-            cv2.drawContours(image, contours, -1, (0, 0, 255), 2)
+            self.draw_half_highlight(image, self.closest_half)
 
             if self.got_it_time:
                 text = f"moove! {self.closest_half}"
@@ -289,37 +411,172 @@ class SurfaceAPI:
                     aga_text_x = image.shape[1] - aga_text_size[0] - 20
                     aga_text_y = text_size[1] + 70
                     cv2.putText(image, aga_text, (aga_text_x, aga_text_y), font, font_scale, (0, 0, 25), thickness)
-
-        self.prev_finger_position = finger_position
-        self.prev_palm_size = palm_size
     
+    def get_ring_maps(self, shape):
+        # растры считаются только для зафиксированной поверхности: пока она не зафиксирована, кольца меняются каждый кадр
+        if not self.is_surface_locked or not self.rings:
+            return None
+        maps = self.ring_maps
+        if maps is not None and maps['rings'] is self.rings and maps['shape'] == shape[:2]:
+            return maps
+        self.ring_maps = self.build_ring_maps(shape[:2])
+        return self.ring_maps
+
+    def build_ring_maps(self, shape):
+        height, width = shape
+        # для каждого пикселя ищем кольцо с ближайшим краем и запоминаем, внутри ли он этого кольца
+        best = np.full((height, width), np.inf, dtype=np.float32)
+        closest = np.zeros((height, width), dtype=np.intp)
+        is_inside = np.zeros((height, width), dtype=bool)
+        inside_any = np.zeros((height, width), dtype=bool)
+        mask = np.zeros((height, width), dtype=np.uint8)
+        for i, ring in enumerate(self.rings):
+            mask[:] = 0
+            cv2.drawContours(mask, [ring], 0, 255, -1)
+            inside = mask > 0
+            # расстояние до края: внутри — до ближайшего внешнего пикселя, снаружи — до ближайшего внутреннего
+            distance = np.where(inside, cv2.distanceTransform(mask, cv2.DIST_L2, cv2.DIST_MASK_5),
+                                cv2.distanceTransform(255 - mask, cv2.DIST_L2, cv2.DIST_MASK_5))
+            closer = distance < best
+            best[closer] = distance[closer]
+            closest[closer] = i
+            is_inside[closer] = inside[closer]
+            inside_any |= inside
+
+        centers_y = np.array([c[1] if c is not None else -1 for c in self.ring_centers])
+        has_center = np.array([c is not None for c in self.ring_centers])
+        rows = np.arange(height)[:, None]
+        is_upper = rows < centers_y[closest]
+
+        # та же поправка, что и в find_closest_half: внутри нижней половины — следующее кольцо, снаружи верхней — предыдущее
+        ring_number = closest + 1
+        ring_number = np.where(is_inside & ~is_upper, np.minimum(self.num_rings + 1, ring_number + 1), ring_number)
+        ring_number = np.where(~is_inside & is_upper, np.maximum(1, ring_number - 1), ring_number)
+
+        # 0 — нет метки, иначе индекс в half_names плюс один
+        labels = ((ring_number - 1) * 2 + np.where(is_upper, 0, 1) + 1).astype(np.uint8)
+        labels[~has_center[closest]] = 0
+
+        half_names = [None]
+        for i in range(len(self.rings)):
+            half_names.extend((f"{i+1}U", f"{i+1}L"))
+
+        return {'rings': self.rings, 'shape': (height, width), 'labels': labels, 'half_names': half_names,
+                'inside_any': inside_any, 'highlights': {}}
+
+    def point_in_maps(self, maps, point):
+        x, y = int(point[0]), int(point[1])
+        height, width = maps['shape']
+        if 0 <= x < width and 0 <= y < height:
+            return y, x
+        return None
+
+    def is_inside_rings(self, point, shape):
+        maps = self.get_ring_maps(shape)
+        pixel = self.point_in_maps(maps, point) if maps is not None else None
+        if pixel is not None:
+            return bool(maps['inside_any'][pixel])
+        return any(cv2.pointPolygonTest(ring, point, False) >= 0 for ring in self.rings)
+
+    def find_closest_half(self, point, shape):
+        maps = self.get_ring_maps(shape)
+        pixel = self.point_in_maps(maps, point) if maps is not None else None
+        if pixel is not None:
+            self.closest_ring = None
+            return maps['half_names'][maps['labels'][pixel]]
+
+        # палец за пределами кадра или поверхность не зафиксирована — считаем напрямую по контурам
+        distances = [cv2.pointPolygonTest(ring, point, True) for ring in self.rings]
+        self.closest_ring = np.argmin(np.abs(distances))
+        ring_center = self.ring_centers[self.closest_ring]
+        if ring_center is None:
+            return None
+
+        ring_number = self.closest_ring + 1
+        is_inside = distances[self.closest_ring] >= 0
+        if point[1] < ring_center[1]:
+            if not is_inside:
+                ring_number = max(1, ring_number - 1)
+            return f"{ring_number}U"
+        if is_inside:
+            ring_number = min(self.num_rings + 1, ring_number + 1)
+        return f"{ring_number}L"
+
+    def get_half_highlight(self, name, shape):
+        maps = self.get_ring_maps(shape)
+        if maps is not None and name in maps['highlights']:
+            return maps['highlights'][name]
+
+        ring, half = self.ring_halves[name]
+        ring_center = self.ring_centers[int(name[:-1]) - 1]
+        if ring_center is None:
+            return None
+        cY = ring_center[1]
+
+        mask = np.zeros(shape[:2], dtype=np.uint8)
+        cv2.drawContours(mask, [ring], 0, 255, -1)
+        if half == "upper":
+            mask[cY:, :] = 0
+        else:
+            mask[:cY, :] = 0
+
+        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        highlight = None
+        if contours:
+            # смешиваем только в рамке половины, а не по всему кадру
+            x, y, w, h = cv2.boundingRect(np.concatenate(contours))
+            box = (slice(y, y + h), slice(x, x + w))
+            overlay = np.zeros((h, w) + tuple(shape[2:]), dtype=np.uint8)
+            overlay[mask[box] == 255] = (0, 0, 255)
+            highlight = (box, overlay, contours)
+
+        if maps is not None:
+            maps['highlights'][name] = highlight
+        return highlight
+
+    def draw_half_highlight(self, image, name):
+        highlight = self.get_half_highlight(name, image.shape)
+        if highlight is None:
+            return
+        box, overlay, contours = highlight
+        image[box] = cv2.addWeighted(image[box], 1, overlay, 0.5, 0)
+        cv2.drawContours(image, contours, -1, (0, 0, 255), 2)
+
     def draw_axes(self, image):
         if self.surface_contour is not None and self.is_surface_locked and self.center is not None:
             cX, cY = self.center
+            # оси рисуются один раз вокруг центра холста и потом только сдвигаются за центром
+            origin = self.axis_length + 60
+            key = (self.axis_length, self.tick_interval)
+            if not self.axes_layer.is_current(key):
+                self.axes_layer.render(key, 2 * origin, 2 * origin,
+                                       lambda canvas: self.draw_axes_at(canvas, origin, origin))
+            self.axes_layer.composite(image, (cX - origin, cY - origin))
+
+    def draw_axes_at(self, image, cX, cY):
+        cv2.line(image, (cX, cY), (cX + self.axis_length, cY), (200, 200, 200), 2) 
+        cv2.line(image, (cX, cY), (cX, cY + self.axis_length), (150, 150, 150), 2)  
+        cv2.line(image, (cX, cY), (cX, cY - self.axis_length), (100, 100, 100), 2) 
+
+        for i in range(1, self.axis_length // self.tick_interval + 1):
+            tick_length = 10
+            tick_value = i * self.tick_interval
+            
+            x_tick = cX + i * self.tick_interval
+            cv2.line(image, (x_tick, cY - tick_length), (x_tick, cY + tick_length), (200, 200, 200), 1)
+            cv2.putText(image, str(tick_value), (x_tick - 10, cY + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+            
+            y_tick = cY + i * self.tick_interval
+            cv2.line(image, (cX - tick_length, y_tick), (cX + tick_length, y_tick), (150, 150, 150), 1)
+            cv2.putText(image, str(tick_value), (cX - 40, y_tick + 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
+            
+            z_tick = cY - i * self.tick_interval
+            cv2.line(image, (cX - tick_length, z_tick), (cX + tick_length, z_tick), (100, 100, 100), 1)
+            cv2.putText(image, str(tick_value), (cX + 15, z_tick + 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (100, 100, 100), 1)
 
-            cv2.line(image, (cX, cY), (cX + self.axis_length, cY), (200, 200, 200), 2) 
-            cv2.line(image, (cX, cY), (cX, cY + self.axis_length), (150, 150, 150), 2)  
-            cv2.line(image, (cX, cY), (cX, cY - self.axis_length), (100, 100, 100), 2) 
-
-            for i in range(1, self.axis_length // self.tick_interval + 1):
-                tick_length = 10
-                tick_value = i * self.tick_interval
-                
-                x_tick = cX + i * self.tick_interval
-                cv2.line(image, (x_tick, cY - tick_length), (x_tick, cY + tick_length), (200, 200, 200), 1)
-                cv2.putText(image, str(tick_value), (x_tick - 10, cY + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
-                
-                y_tick = cY + i * self.tick_interval
-                cv2.line(image, (cX - tick_length, y_tick), (cX + tick_length, y_tick), (150, 150, 150), 1)
-                cv2.putText(image, str(tick_value), (cX - 40, y_tick + 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (150, 150, 150), 1)
-                
-                z_tick = cY - i * self.tick_interval
-                cv2.line(image, (cX - tick_length, z_tick), (cX + tick_length, z_tick), (100, 100, 100), 1)
-                cv2.putText(image, str(tick_value), (cX + 15, z_tick + 5), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (100, 100, 100), 1)
-
-            cv2.putText(image, "X", (cX + self.axis_length + 10, cY), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2)
-            cv2.putText(image, "Y", (cX, cY + self.axis_length + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (150, 150, 150), 2)
-            cv2.putText(image, "Z", (cX, cY - self.axis_length - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (100, 100, 100), 2)
+        cv2.putText(image, "X", (cX + self.axis_length + 10, cY), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (200, 200, 200), 2)
+        cv2.putText(image, "Y", (cX, cY + self.axis_length + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (150, 150, 150), 2)
+        cv2.putText(image, "Z", (cX, cY - self.axis_length - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (100, 100, 100), 2)
 
     def draw_vertical_axis(self, image):
         if self.center is not None:
@@ -348,7 +605,10 @@ class SurfaceAPI:
                 self.is_clicking = False
 
         if not self.is_clicking and self.is_surface_locked:
-            if self.prev_frame is not None:
+            if self.motion is not None:
+                if self.motion.has_previous and self.motion.mean_diff > 30:
+                    self.is_surface_locked = False
+            elif self.prev_frame is not None:
                 diff = cv2.absdiff(image, self.prev_frame)
                 mean_diff = np.mean(diff)
                 if mean_diff > 30: 
@@ -358,4 +618,5 @@ class SurfaceAPI:
             self.highlight_closest_ring_half(image, finger_position, palm_size)
         
         self.update_center(finger_position)
-        self.prev_frame = image.copy()
\ No newline at end of file
+        if self.motion is None:
+            self.prev_frame = image.copy()
\ No newline at end of file
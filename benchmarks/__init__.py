@@ -0,0 +1,2 @@
+from .harness import BenchmarkResult, run_benchmark, save_results, load_results, compare_results
+from .stages import BENCHMARKS
\ No newline at end of file
@@ -0,0 +1,60 @@
+import argparse
+import sys
+from .harness import save_results, load_results, compare_results, print_results, print_comparison
+from .fixtures import synthetic_frames, synthetic_landmarks, load_frames, load_landmarks, prepare_frames
+from .stages import BENCHMARKS
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='per-stage benchmarks for handy')
+    parser.add_argument('--frames', help='video file or directory of images to use instead of synthetic frames')
+    parser.add_argument('--landmarks', help='landmark recording to use instead of synthetic landmarks')
+    parser.add_argument('--count', type=int, default=120, help='number of frames and landmark sets per benchmark')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the synthetic fixtures')
+    parser.add_argument('--only', nargs='*', help='run only benchmarks whose name contains one of these strings')
+    parser.add_argument('--skip-model', action='store_true', help='skip benchmarks that run the MediaPipe model')
+    parser.add_argument('--output', default='bench_results.json', help='where to write the JSON results')
+    parser.add_argument('--compare', metavar='BASELINE', help='JSON results of a previous run to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.10,
+                        help='relative p50 slowdown reported as a regression')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+
+    if args.frames:
+        frames = load_frames(args.frames, args.count)
+    else:
+        frames = synthetic_frames(args.count, args.seed)
+    if args.landmarks:
+        landmarks, timestamps = load_landmarks(args.landmarks, args.count)
+    else:
+        landmarks, timestamps = synthetic_landmarks(args.count, args.seed)
+    fixtures = {
+        'frames': args.frames or f'synthetic(seed={args.seed})',
+        'landmarks': args.landmarks or f'synthetic(seed={args.seed})',
+        'frame_count': len(frames),
+        'landmark_count': len(landmarks),
+        'frame_size': list(frames[0].shape[1::-1]),
+    }
+    frames = prepare_frames(frames)
+
+    results = []
+    for name, benchmark in BENCHMARKS:
+        if args.only and not any(pattern in name for pattern in args.only):
+            continue
+        if args.skip_model and name == 'detect_hand':
+            continue
+        results.extend(benchmark(frames=frames, landmarks=landmarks, timestamps=timestamps))
+
+    print_results(results)
+    report = save_results(args.output, results, fixtures)
+    print(f"\nResults written to {args.output}")
+
+    if args.compare:
+        rows, regressions = compare_results(load_results(args.compare), report, tolerance=args.tolerance)
+        print_comparison(rows, regressions)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+import cv2
+import numpy as np
+from core import open_source, LandmarkRecording
+from core.landmark_recording import NO_HAND
+
+FRAME_SIZE = (640, 480)
+
+# canonical open right hand in normalized image coordinates, MediaPipe landmark order
+CANONICAL_HAND = np.array([
+    [0.500, 0.850, 0.000],
+    [0.440, 0.800, -0.010], [0.410, 0.770, -0.020], [0.390, 0.740, -0.030], [0.370, 0.710, -0.040],
+    [0.450, 0.700, -0.010], [0.445, 0.660, -0.020], [0.442, 0.630, -0.030], [0.440, 0.600, -0.040],
+    [0.500, 0.690, -0.010], [0.500, 0.645, -0.020], [0.500, 0.612, -0.030], [0.500, 0.580, -0.040],
+    [0.550, 0.700, -0.010], [0.553, 0.660, -0.020], [0.555, 0.630, -0.030], [0.557, 0.600, -0.040],
+    [0.590, 0.720, -0.010], [0.595, 0.690, -0.020], [0.598, 0.667, -0.030], [0.600, 0.645, -0.040],
+], dtype=np.float32)
+
+def surface_polygon(width, height):
+    return np.array([
+        [int(width * 0.10), int(height * 0.55)], [int(width * 0.90), int(height * 0.55)],
+        [int(width * 0.97), int(height * 0.97)], [int(width * 0.03), int(height * 0.97)],
+    ], dtype=np.int32).reshape(-1, 1, 2)
+
+def synthetic_frames(count, seed=0, size=FRAME_SIZE):
+    width, height = size
+    rng = np.random.default_rng(seed)
+    background = np.tile(np.linspace(40, 90, width, dtype=np.float32), (height, 1))
+    background = cv2.cvtColor(background.astype(np.uint8), cv2.COLOR_GRAY2BGR)
+    cv2.fillPoly(background, [surface_polygon(width, height)], (190, 190, 190))
+
+    frames = []
+    for i in range(count):
+        frame = background.copy()
+        hand = CANONICAL_HAND[:, :2] + synthetic_offset(i)[:2]
+        points = (hand * (width, height)).astype(np.int32)
+        cv2.fillPoly(frame, [cv2.convexHull(points)], (120, 140, 170))
+        noise = rng.integers(0, 12, size=frame.shape, dtype=np.uint8)
+        frames.append(cv2.add(frame, noise))
+    return frames
+
+def synthetic_offset(i):
+    return np.array([0.05 * np.sin(2 * np.pi * i / 90), 0.02 * np.sin(2 * np.pi * i / 60), 0.0], dtype=np.float32)
+
+def synthetic_landmarks(count, seed=0):
+    rng = np.random.default_rng(seed)
+    landmarks = np.empty((count, 21, 3), dtype=np.float32)
+    for i in range(count):
+        frame = CANONICAL_HAND + synthetic_offset(i)
+        phase = i % 24
+        if phase < 4:
+            # index finger tap every 24 frames
+            frame[6:9, 1] += 0.03 * (1 - abs(phase - 1.5) / 1.5)
+        landmarks[i] = frame + rng.normal(0, 0.002, size=(21, 3)).astype(np.float32)
+    timestamps = np.arange(count, dtype=np.float64) / 30.0
+    return landmarks, timestamps
+
+def load_frames(path, count):
+    source = open_source(path, realtime=False)
+    frames = []
+    try:
+        while source.is_opened() and len(frames) < count:
+            success, image, _ = source.read()
+            if success:
+                frames.append(image)
+    finally:
+        source.release()
+    return frames
+
+def load_landmarks(path, count):
+    recording = LandmarkRecording(path)
+    present = np.flatnonzero(recording.handedness != NO_HAND)[:count]
+    return np.array(recording.landmarks[present]), np.array(recording.timestamps[present])
+
+def prepare_frames(frames):
+    flipped = [cv2.flip(frame, 1) for frame in frames]
+    return [cv2.cvtColor(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), cv2.COLOR_GRAY2BGR) for frame in flipped]
+
+class FixtureSource:
+    def __init__(self, frames):
+        self.frames = frames
+        self.index = 0
+        self.mirrored = False
+
+    def frame_size(self):
+        height, width = self.frames[0].shape[:2]
+        return width, height
+
+    def read(self):
+        frame = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        return True, frame, self.index / 30.0
+
+    def is_opened(self):
+        return True
+
+    def release(self):
+        pass
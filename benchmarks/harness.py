@@ -0,0 +1,103 @@
+import json
+import platform
+import subprocess
+import time
+import cv2
+import numpy as np
+
+class BenchmarkResult:
+    def __init__(self, name, samples_ns):
+        self.name = name
+        self.samples_ms = np.asarray(samples_ns, dtype=np.float64) / 1e6
+
+    @property
+    def calls(self):
+        return len(self.samples_ms)
+
+    def summary(self):
+        if self.calls == 0:
+            return {'calls': 0}
+        p50, p95, p99 = np.percentile(self.samples_ms, [50, 95, 99])
+        total_s = self.samples_ms.sum() / 1000
+        return {
+            'calls': self.calls,
+            'mean_ms': float(self.samples_ms.mean()),
+            'p50_ms': float(p50),
+            'p95_ms': float(p95),
+            'p99_ms': float(p99),
+            'throughput_per_s': float(self.calls / total_s) if total_s > 0 else None,
+        }
+
+def run_benchmark(name, func, inputs, setup=None, warmup=5, repeat=1):
+    inputs = list(inputs)
+    for item in inputs[:warmup]:
+        func(setup(item) if setup else item)
+
+    samples = []
+    for _ in range(repeat):
+        for item in inputs:
+            argument = setup(item) if setup else item
+            start = time.perf_counter_ns()
+            func(argument)
+            samples.append(time.perf_counter_ns() - start)
+    return BenchmarkResult(name, samples)
+
+def git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'],
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def environment_info():
+    return {
+        'revision': git_revision(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+    }
+
+def save_results(path, results, fixtures):
+    report = {
+        'environment': environment_info(),
+        'fixtures': fixtures,
+        'results': {result.name: result.summary() for result in results},
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+def compare_results(baseline, current, metric='p50_ms', tolerance=0.10):
+    regressions = []
+    rows = []
+    for name, summary in current['results'].items():
+        previous = baseline['results'].get(name)
+        if not previous or metric not in previous or metric not in summary:
+            continue
+        ratio = summary[metric] / previous[metric] if previous[metric] > 0 else float('inf')
+        rows.append((name, previous[metric], summary[metric], ratio))
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+    return rows, regressions
+
+def print_results(results):
+    print(f"{'benchmark':<42}{'calls':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'per s':>11}")
+    for result in results:
+        summary = result.summary()
+        if summary['calls'] == 0:
+            continue
+        print(f"{result.name:<42}{summary['calls']:>7}{summary['p50_ms']:>10.3f}{summary['p95_ms']:>10.3f}"
+              f"{summary['p99_ms']:>10.3f}{summary['throughput_per_s']:>11.0f}")
+
+def print_comparison(rows, regressions, metric='p50_ms'):
+    print(f"\n{'benchmark':<42}{'baseline':>10}{'current':>10}{'ratio':>8}  ({metric})")
+    for name, previous, current, ratio in rows:
+        flag = '  REGRESSION' if name in regressions else ''
+        print(f"{name:<42}{previous:>10.3f}{current:>10.3f}{ratio:>8.2f}{flag}")
@@ -0,0 +1,158 @@
+import time
+import cv2
+import numpy as np
+from api import HandAPI, SurfaceAPI, HandTracker, HandDetections
+from core import VideoProcessor, StateManager, HistoryManager, GestureHandler, MotionAnalyzer
+from gestures import CursorControl, ClickHandler, ActionDispatcher, RecordingBackend
+from additional.utils import detect_significant_changes, smooth_finger_tips
+from .harness import BenchmarkResult, run_benchmark
+from .fixtures import FixtureSource, surface_polygon
+
+def locked_surface(width, height):
+    surface_api = SurfaceAPI(highlight_color=(200, 200, 200, 0.05))
+    surface_api.surface_contour = surface_polygon(width, height)
+    surface_api.surface_color = 190.0
+    surface_api.is_surface_locked = True
+    surface_api.center = (width // 2, int(height * 0.75))
+    return surface_api
+
+def bench_preprocess_image(frames, **_):
+    hand_api = HandAPI(SurfaceAPI(), load_model=False)
+    gray_frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames]
+    return [
+        run_benchmark('HandAPI.preprocess_image', hand_api.preprocess_image, frames),
+        run_benchmark('HandAPI.preprocess_image[gray]', hand_api.preprocess_image, gray_frames),
+    ]
+
+def bench_detect_hand(frames, **_):
+    hand_api = HandAPI(SurfaceAPI())
+    return [run_benchmark('HandAPI.detect_hand', hand_api.detect_hand, frames)]
+
+def bench_get_hand_info(frames, landmarks, **_):
+    height, width = frames[0].shape[:2]
+    hand_api = HandAPI(SurfaceAPI(), load_model=False)
+    hand_api.image_width, hand_api.image_height = width, height
+    image = frames[0]
+    return [run_benchmark('HandAPI.get_hand_info', lambda hand: hand_api.get_hand_info(image, hand),
+                          landmarks)]
+
+def bench_hand_tracker(frames, landmarks, **_):
+    tracker = HandTracker(max_hands=2)
+    # the second hand mirrors the first across the frame, so both stay matched to their own slot
+    handedness = np.array([0, 1], dtype=np.int8)
+    pairs = []
+    for hand in landmarks:
+        mirrored = hand.copy()
+        mirrored[:, 0] = 1 - mirrored[:, 0]
+        pairs.append(HandDetections(np.stack([hand, mirrored]), handedness))
+    return [run_benchmark('HandTracker.update[2 hands]', tracker.update, pairs)]
+
+def bench_detect_surface(frames, **_):
+    results = []
+    for name, scale in (('SurfaceAPI.detect_surface', 1.0), ('SurfaceAPI.detect_surface[0.5x]', 0.5)):
+        surface_api = SurfaceAPI()
+        surface_api.detection_scale = scale
+
+        def unlocked(frame, surface_api=surface_api):
+            surface_api.is_surface_locked = False
+            surface_api.got_it_time = None
+            return frame
+
+        results.append(run_benchmark(name, surface_api.detect_surface, frames, setup=unlocked))
+    return results
+
+def bench_surface_overlay(frames, **_):
+    height, width = frames[0].shape[:2]
+    surface_api = locked_surface(width, height)
+    copy = lambda frame: frame.copy()
+    return [
+        run_benchmark('SurfaceAPI.highlight_surface', surface_api.highlight_surface, frames, setup=copy),
+        run_benchmark('SurfaceAPI.draw_inner_rings',
+                      lambda image: surface_api.draw_inner_rings(image, surface_api.surface_contour),
+                      frames, setup=copy),
+    ]
+
+def bench_significant_changes(frames, **_):
+    pairs = list(zip(frames[1:], frames[:-1]))
+    motion = MotionAnalyzer()
+    # VideoProcessor hands the analyzer the luma plane it already has
+    grays = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames]
+    return [
+        run_benchmark('detect_significant_changes',
+                      lambda pair: detect_significant_changes(pair[0], pair[1], 30), pairs),
+        run_benchmark('MotionAnalyzer.update', motion.update, grays),
+    ]
+
+def bench_gesture_checks(frames, landmarks, timestamps, **_):
+    height, width = frames[0].shape[:2]
+    hand_api = HandAPI(SurfaceAPI(), load_model=False)
+    hand_api.image_width, hand_api.image_height = width, height
+    history = HistoryManager()
+    clock = {'now': 0.0}
+    gesture = GestureHandler(clock=lambda: clock['now'])
+
+    stages = [
+        ('HistoryManager.update_positions', lambda f: history.update_positions(
+            f['tips'][1], f['tips'][2], f['tips'][3], f['tips'][4], f['size'], f['center'])),
+        ('GestureFeatures.extract', lambda f: gesture.features.extract(
+            history, f['tips'][1:], f['last_position'], gesture, clock['now'])),
+        ('GestureHandler.evaluate', lambda f: gesture.evaluate(history, f['tips'][1:], f['last_position'])),
+    ]
+    samples = {name: [] for name, _ in stages}
+
+    last_position = None
+    for frame_landmarks, timestamp in zip(landmarks, timestamps):
+        clock['now'] = float(timestamp)
+        hand_frame = hand_api.get_hand_info(None, frame_landmarks)
+        hand_frame.finger_tips = smooth_finger_tips(hand_frame.finger_tips, history.finger_tips_history)
+        tips = hand_frame.tip_points()
+        frame = {'tips': tips, 'last_position': last_position, 'size': hand_frame.size, 'center': hand_frame.center}
+
+        for name, stage in stages:
+            start = time.perf_counter_ns()
+            stage(frame)
+            samples[name].append(time.perf_counter_ns() - start)
+
+        gesture.update_cooldowns()
+        last_position = tips[1]
+
+    return [BenchmarkResult(name, samples[name]) for name, _ in stages]
+
+def null_dispatcher():
+    # mouse output is not what these benchmarks measure
+    return ActionDispatcher(RecordingBackend(record=False), threaded=False)
+
+def bench_move_cursor(frames, landmarks, **_):
+    height, width = frames[0].shape[:2]
+    cursor_control = CursorControl(1920, 1080, dispatcher=null_dispatcher())
+    center = (width // 2, int(height * 0.75))
+    tips = [(int(hand[8, 0] * width), int(hand[8, 1] * height)) for hand in landmarks]
+    return [run_benchmark('CursorControl.move_cursor',
+                          lambda tip: cursor_control.move_cursor(tip, center, width, height), tips)]
+
+def bench_draw_interface(frames, **_):
+    dispatcher = null_dispatcher()
+    video_processor = VideoProcessor(FixtureSource(frames), dispatcher=dispatcher)
+    height, width = frames[0].shape[:2]
+    video_processor.surface_api = locked_surface(width, height)
+    video_processor.hand_api.surface_api = video_processor.surface_api
+    state_manager = StateManager(dispatcher=dispatcher)
+    click_handler = ClickHandler(dispatcher=dispatcher)
+    result = run_benchmark('VideoProcessor.draw_interface',
+                           lambda image: video_processor.draw_interface(image, state_manager, click_handler, show=False),
+                           frames, setup=lambda frame: frame.copy())
+    video_processor.release()
+    return [result]
+
+BENCHMARKS = [
+    ('preprocess_image', bench_preprocess_image),
+    ('detect_hand', bench_detect_hand),
+    ('get_hand_info', bench_get_hand_info),
+    ('hand_tracker', bench_hand_tracker),
+    ('detect_surface', bench_detect_surface),
+    ('surface_overlay', bench_surface_overlay),
+    ('significant_changes', bench_significant_changes),
+    ('gesture_checks', bench_gesture_checks),
+    ('move_cursor', bench_move_cursor),
+    ('draw_interface', bench_draw_interface),
+]
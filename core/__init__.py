@@ -1,4 +1,12 @@
 from .video_processor import VideoProcessor
-from .state_manager import StateManager
-from .gesture_handler import GestureHandler
+from .state_manager import StateManager, HandState
+from .gesture_handler import GestureHandler, DEFAULT_GESTURE_RULES
+from .gesture_rules import GestureRules
 from .history_manager import HistoryManager
+from .motion_analyzer import MotionAnalyzer
+from .capture_thread import CaptureThread
+from .frame_pipeline import FramePipeline
+from .camera_supervisor import CameraSupervisor
+from .frame_source import CameraSource, VideoFileSource, ImageDirectorySource, open_source
+from .landmark_recording import LandmarkRecorder, LandmarkRecording, LandmarkReplay
+from .perf_monitor import PerfMonitor, PerfSink
\ No newline at end of file
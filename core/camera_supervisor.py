@@ -0,0 +1,308 @@
+import multiprocessing
+import queue
+import signal
+from multiprocessing import shared_memory
+import cv2
+import numpy as np
+from api import HandAPI, SolutionsHandsBackend, HandLandmarkerBackend, HandDetections
+from api.hand_tracker import UNKNOWN_HANDEDNESS
+from .frame_source import open_source
+from .video_processor import mirror_frame
+
+DEFAULT_WORKER_OPTIONS = {
+    'realtime': True,
+    'fps': 30.0,
+    'grayscale': False,
+    'max_hands': 1,
+    'roi_tracking': False,
+    'detect_every': 1,
+    'adaptive_detection': False,
+    'backend': 'solutions',
+    'landmarker_model': 'models/hand_landmarker.task',
+    'delegate': 'cpu',
+    'max_in_flight': 2,
+}
+
+READ_RETRIES = 8
+
+def observation_dtype(max_hands):
+    # one record per camera; an odd sequence means the worker is in the middle of writing it
+    return np.dtype([
+        ('sequence', np.uint64),
+        ('timestamp', np.float64),
+        ('frame_slot', np.int32),
+        ('count', np.int32),
+        ('finished', np.uint8),
+        ('handedness', np.int8, (max_hands,)),
+        ('landmarks', np.float32, (max_hands, 21, 3)),
+    ])
+
+def open_hand_backend(options):
+    if options['backend'] == 'tasks':
+        return HandLandmarkerBackend(options['landmarker_model'], num_hands=options['max_hands'],
+                                     delegate=options['delegate'], max_in_flight=options['max_in_flight'])
+    return SolutionsHandsBackend(max_num_hands=options['max_hands'])
+
+def publish_observation(record, frame_slots, slot, gray, timestamp, hands):
+    # запись помечается нечётной до того, как в слот пишутся пиксели: читатель, копирующий этот слот, увидит это
+    sequence = int(record['sequence'][0])
+    record['sequence'] = sequence + 1
+    np.copyto(frame_slots[slot], gray)
+
+    record['timestamp'] = timestamp
+    record['frame_slot'] = slot
+    if hands is None:
+        count = 0
+    elif isinstance(hands, HandDetections):
+        count = min(len(hands), record['landmarks'].shape[1])
+        record['landmarks'][0, :count] = hands.landmarks[:count]
+        record['handedness'][0, :count] = hands.handedness[:count]
+    else:
+        count = 1
+        record['landmarks'][0, 0] = hands
+        record['handedness'][0, 0] = UNKNOWN_HANDEDNESS
+    record['count'] = count
+    record['sequence'] = sequence + 2
+
+def run_camera_worker(index, spec, options, frame_size, observation_name, frame_name, camera_count,
+                      stop_event, updated, errors):
+    # Ctrl+C reaches the whole process group; workers stop through stop_event once the supervisor sees it
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    observation_memory = shared_memory.SharedMemory(name=observation_name)
+    frame_memory = shared_memory.SharedMemory(name=frame_name)
+    width, height = frame_size
+    records = np.ndarray((camera_count,), dtype=observation_dtype(options['max_hands']), buffer=observation_memory.buf)
+    frames = np.ndarray((camera_count, 2, height, width), dtype=np.uint8, buffer=frame_memory.buf)
+    record = records[index:index + 1]
+    frame_slots = frames[index]
+
+    source = None
+    hand_api = None
+    try:
+        source = open_source(spec, realtime=options['realtime'], fps=options['fps'])
+        hand_api = HandAPI(None, roi_tracking=options['roi_tracking'], detect_every=options['detect_every'],
+                           adaptive_detection=options['adaptive_detection'], backend=open_hand_backend(options),
+                           max_hands=options['max_hands'])
+        hand_api.image_width, hand_api.image_height = width, height
+        flip_matrix = np.array([[-1, 0, width - 1], [0, 1, 0]], dtype=np.float32)
+
+        published = 0
+        while not stop_event.is_set() and source.is_opened():
+            success, image, timestamp = source.read()
+            if not success:
+                continue
+            if image.shape[1] != width or image.shape[0] != height:
+                image = cv2.resize(image, frame_size, interpolation=cv2.INTER_AREA)
+
+            image, gray = mirror_frame(image, flip_matrix, options['grayscale'])
+            hands = hand_api.detect_hand(image)
+            if not hand_api.new_result:
+                # асинхронная модель ещё не ответила; публиковать нечего
+                continue
+            if hands is not None and hand_api.pending_prediction_update:
+                # предсказатель между детекциями питается сглаженными точками, как в основном процессе
+                hand_api.get_hand_info(None, hands)
+
+            publish_observation(record, frame_slots, published % 2, gray, timestamp, hands)
+            published += 1
+            updated.release()
+    except Exception as error:
+        errors.put((index, f"{type(error).__name__}: {error}"))
+    finally:
+        record['finished'] = 1
+        updated.release()
+        if hand_api is not None and hand_api.backend is not None:
+            hand_api.backend.close()
+        if source is not None:
+            source.release()
+        del record, frame_slots, records, frames
+        observation_memory.close()
+        frame_memory.close()
+
+class CameraSupervisor:
+    # one capture+inference process per camera, read like a single frame source. landmarks and the mirrored luma
+    # frame come back through shared memory; the output follows one camera at a time, the first listed preferred
+    def __init__(self, specs, options=None, frame_size=None, handoff_frames=5, join_timeout=2.0):
+        self.specs = list(specs)
+        self.options = dict(DEFAULT_WORKER_OPTIONS, **(options or {}))
+        self.handoff_frames = handoff_frames
+        self.join_timeout = join_timeout
+        max_hands = self.options['max_hands']
+        if max_hands > 1 and (self.options['roi_tracking'] or self.options['detect_every'] > 1
+                              or self.options['adaptive_detection']):
+            raise ValueError("ROI tracking and detection decimation follow a single hand; use them with max_hands=1")
+
+        if frame_size is None:
+            # every worker scales its frames to the first camera's size
+            probe = open_source(self.specs[0], realtime=False, fps=self.options['fps'])
+            frame_size = probe.frame_size()
+            probe.release()
+        self.width, self.height = frame_size
+        self.realtime = self.options['realtime']
+        self.mirrored = True
+
+        count = len(self.specs)
+        dtype = observation_dtype(max_hands)
+        self.observation_memory = shared_memory.SharedMemory(create=True, size=dtype.itemsize * count)
+        self.frame_memory = shared_memory.SharedMemory(create=True, size=count * 2 * self.height * self.width)
+        self.records = np.ndarray((count,), dtype=dtype, buffer=self.observation_memory.buf)
+        self.records[...] = 0
+        self.frames = np.ndarray((count, 2, self.height, self.width), dtype=np.uint8, buffer=self.frame_memory.buf)
+
+        # the latest consistent copy of every camera's record
+        self.seen_sequence = np.zeros(count, dtype=np.uint64)
+        self.timestamps = np.zeros(count)
+        self.frame_slots = np.zeros(count, dtype=np.int32)
+        self.counts = np.zeros(count, dtype=np.int32)
+        self.handedness = np.zeros((count, max_hands), dtype=np.int8)
+        self.landmarks = np.zeros((count, max_hands, 21, 3), dtype=np.float32)
+
+        self.active = None
+        self.missing = 0
+        self.switched = False
+        self.current = None
+        self.dropped_frames = 0
+        self.released = False
+
+        # spawn, not fork: the model and OpenCV start threads that a forked child would inherit half-initialised
+        context = multiprocessing.get_context('spawn')
+        self.stop_event = context.Event()
+        self.updated = context.Semaphore(0)
+        self.errors = context.Queue()
+        self.processes = [
+            context.Process(target=run_camera_worker, name=f'camera-{index}', daemon=True,
+                            args=(index, spec, self.options, (self.width, self.height), self.observation_memory.name,
+                                  self.frame_memory.name, count, self.stop_event, self.updated, self.errors))
+            for index, spec in enumerate(self.specs)
+        ]
+
+    def start(self):
+        for process in self.processes:
+            process.start()
+        return self
+
+    def frame_size(self):
+        return self.width, self.height
+
+    def running_cameras(self):
+        return [index for index, process in enumerate(self.processes)
+                if not self.records['finished'][index] and process.is_alive()]
+
+    def is_opened(self):
+        return not self.released and bool(self.running_cameras())
+
+    def read(self):
+        while self.is_opened():
+            if not self.updated.acquire(timeout=0.1):
+                self.report_errors()
+                continue
+            while self.updated.acquire(False):
+                pass
+            self.report_errors()
+
+            camera = self.collect()
+            if camera is None:
+                continue
+            image = self.copy_frame(camera)
+            if image is not None:
+                return True, image, float(self.timestamps[camera])
+        self.report_errors()
+        return False, None, None
+
+    def read_observation(self, index):
+        records = self.records
+        for _ in range(READ_RETRIES):
+            sequence = int(records['sequence'][index])
+            if sequence == self.seen_sequence[index]:
+                return False
+            if sequence % 2:
+                continue
+            self.timestamps[index] = records['timestamp'][index]
+            self.frame_slots[index] = records['frame_slot'][index]
+            self.counts[index] = records['count'][index]
+            self.handedness[index] = records['handedness'][index]
+            self.landmarks[index] = records['landmarks'][index]
+            if int(records['sequence'][index]) == sequence:
+                skipped = (sequence - int(self.seen_sequence[index])) // 2 - 1
+                if skipped > 0 and index == self.active:
+                    self.dropped_frames += skipped
+                self.seen_sequence[index] = sequence
+                return True
+        return False
+
+    def copy_frame(self, index):
+        for _ in range(READ_RETRIES):
+            image = self.frames[index, self.frame_slots[index]].copy()
+            # слот перезаписывается только через одну публикацию, и на время записи sequence нечётный:
+            # если после копии sequence чётный и ушёл вперёд не больше чем на одну публикацию, кадр цел
+            sequence = int(self.records['sequence'][index])
+            if sequence % 2 == 0 and sequence - int(self.seen_sequence[index]) <= 2:
+                return image
+            self.read_observation(index)
+        # воркер так и не дописал кадр: лучше пропустить его, чем отдать наполовину новый
+        self.dropped_frames += 1
+        return None
+
+    def collect(self):
+        fresh = [index for index in range(len(self.specs)) if self.read_observation(index)]
+        if not fresh:
+            return None
+        running = self.running_cameras()
+
+        previous = self.active
+        active = previous if previous in running else None
+        if active is not None and active in fresh:
+            self.missing = 0 if self.counts[active] else self.missing + 1
+        # другая камера перехватывает руку, только если текущая не видит её handoff_frames кадров подряд
+        if active is None or (not self.counts[active] and self.missing >= self.handoff_frames):
+            candidates = [index for index in running if self.counts[index]]
+            if candidates and candidates[0] != active:
+                active = candidates[0]
+                self.missing = 0
+        self.switched = previous is not None and active != previous
+        self.active = active
+
+        camera = active if active is not None else (running[0] if running else fresh[0])
+        if camera not in fresh and not self.switched:
+            return None
+
+        # кадр переключения отдаём без руки: координаты другой камеры не должны смешаться с прежним состоянием
+        count = int(self.counts[camera])
+        if self.switched or not count:
+            self.current = None
+        elif self.options['max_hands'] > 1:
+            self.current = HandDetections(self.landmarks[camera, :count].copy(), self.handedness[camera, :count].copy())
+        else:
+            self.current = self.landmarks[camera, 0].copy()
+        return camera
+
+    def hand_landmarks(self):
+        return self.current
+
+    def report_errors(self):
+        while True:
+            try:
+                index, message = self.errors.get_nowait()
+            except queue.Empty:
+                return
+            print(f"Camera {self.specs[index]} stopped: {message}")
+
+    def release(self):
+        if self.released:
+            return
+        self.released = True
+        self.stop_event.set()
+        for process in self.processes:
+            if process.pid is None:
+                continue
+            process.join(self.join_timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join(self.join_timeout)
+        self.report_errors()
+
+        del self.records, self.frames
+        self.observation_memory.close()
+        self.observation_memory.unlink()
+        self.frame_memory.close()
+        self.frame_memory.unlink()
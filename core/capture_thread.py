@@ -0,0 +1,67 @@
+import threading
+import time
+from collections import deque
+
+class CaptureThread:
+    def __init__(self, source, buffer_size=2):
+        self.source = source
+        self.buffer = deque(maxlen=buffer_size)
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+
+        self.read_timeout = 1.0
+        self.retry_delay = 0.005
+
+        self.captured_frames = 0
+        self.dropped_frames = 0
+
+    def start(self):
+        if self.running:
+            return self
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while self.running and self.source.is_opened():
+            success, image, timestamp = self.source.read()
+            if not success:
+                time.sleep(self.retry_delay)
+                continue
+
+            with self.condition:
+                if len(self.buffer) == self.buffer.maxlen:
+                    # deque(maxlen) evicts the oldest frame
+                    self.dropped_frames += 1
+                self.buffer.append((image, timestamp))
+                self.captured_frames += 1
+                self.condition.notify()
+
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+
+    def read(self):
+        with self.condition:
+            if not self.buffer:
+                self.condition.wait_for(lambda: self.buffer or not self.running, self.read_timeout)
+            if not self.buffer:
+                return False, None, None, self.dropped_frames
+
+            image, timestamp = self.buffer.pop()
+            self.dropped_frames += len(self.buffer)
+            self.buffer.clear()
+            return True, image, timestamp, self.dropped_frames
+
+    def is_running(self):
+        return self.running or bool(self.buffer)
+
+    def stop(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(timeout=self.read_timeout)
+        self.thread = None
@@ -0,0 +1,205 @@
+import heapq
+import queue
+import threading
+
+def put_until_stopped(output_queue, item, stop_event):
+    # Blocking put is what gives backpressure: a slow stage stalls the ones before it.
+    while not stop_event.is_set():
+        try:
+            output_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+class FramePacket:
+    __slots__ = ('sequence', 'timestamp', 'image', 'model_input', 'hand_landmarks', 'new_result', 'rendered')
+
+    def __init__(self, sequence, timestamp, image):
+        self.sequence = sequence
+        self.timestamp = timestamp
+        self.image = image
+        self.model_input = None
+        self.hand_landmarks = None
+        self.new_result = True
+        self.rendered = True
+
+class PipelineStage:
+    def __init__(self, name, handler, input_queue, output_queue, stop_event, on_error, perf):
+        self.name = name
+        self.handler = handler
+        self.input_queue = input_queue
+        self.output_queue = output_queue
+        self.stop_event = stop_event
+        self.on_error = on_error
+        self.span = perf.span(name)
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.processed = 0
+
+    def start(self):
+        self.thread.start()
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            packet = self._get()
+            if packet is None:
+                break
+            try:
+                with self.span:
+                    packet = self.handler(packet)
+            except Exception as error:
+                self.on_error(self.name, error)
+                break
+            if packet is not None:
+                self.processed += 1
+                if not put_until_stopped(self.output_queue, packet, self.stop_event):
+                    return
+        put_until_stopped(self.output_queue, None, self.stop_event)
+
+    def _get(self):
+        while not self.stop_event.is_set():
+            try:
+                return self.input_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+class FramePipeline:
+    def __init__(self, video_processor, state_manager, cursor_control, click_handler, queue_size=2, recorder=None,
+                 stop_event=None):
+        self.video_processor = video_processor
+        self.state_manager = state_manager
+        self.cursor_control = cursor_control
+        self.click_handler = click_handler
+        self.queue_size = queue_size
+        self.recorder = recorder
+
+        # a caller's event (e.g. set from a signal handler) stops the stages even while the source delivers nothing
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self.error = None
+        self.sequence = 0
+        self.next_sequence = 0
+        self.pending = []
+
+        handlers = [
+            ('preprocess', self._preprocess),
+            ('inference', self._inference),
+            ('gesture', self._gesture),
+            ('render', self._render),
+        ]
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in range(len(handlers) + 1)]
+        self.capture_thread = threading.Thread(target=self._capture, name='capture', daemon=True)
+        self.stages = [
+            PipelineStage(name, handler, self.queues[i], self.queues[i + 1], self.stop_event, self._on_error,
+                          video_processor.perf)
+            for i, (name, handler) in enumerate(handlers)
+        ]
+
+    def start(self):
+        self.capture_thread.start()
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    def _capture(self):
+        output_queue = self.queues[0]
+        span = self.video_processor.perf.span('capture')
+        while not self.stop_event.is_set() and self.video_processor.is_camera_opened():
+            try:
+                with span:
+                    success, image = self.video_processor.read_frame()
+            except Exception as error:
+                self._on_error('capture', error)
+                break
+            if not success:
+                print("Failed to get frame from camera")
+                continue
+
+            packet = FramePacket(self.sequence, self.video_processor.frame_timestamp, image)
+            self.sequence += 1
+            if not put_until_stopped(output_queue, packet, self.stop_event):
+                return
+
+        put_until_stopped(output_queue, None, self.stop_event)
+
+    def _preprocess(self, packet):
+        hand_api = self.video_processor.hand_api
+        packet.image, gray = self.video_processor.normalize_frame(packet.image)
+        with self.video_processor.surface_lock:
+            self.video_processor.update_surface(packet.image, gray)
+        # only the stateless full-frame input is prepared here; the detect-or-predict decision, the ROI and the
+        # predictor bookkeeping all happen in the inference stage so a single thread drives them
+        if not hand_api.roi_tracking and not hand_api.decimation_enabled():
+            packet.model_input = hand_api.prepare_input(packet.image)
+        return packet
+
+    def _inference(self, packet):
+        hand_api = self.video_processor.hand_api
+        packet.hand_landmarks = hand_api.detect_hand(packet.image, packet.model_input)
+        packet.new_result = hand_api.new_result
+        packet.model_input = None
+        if self.recorder is not None and packet.new_result:
+            with self.video_processor.surface_lock:
+                self.recorder.record_frame(packet.timestamp, packet.hand_landmarks, self.video_processor.surface_api)
+        return packet
+
+    def _gesture(self, packet):
+        headless = self.video_processor.headless
+        if not headless:
+            packet.image = self.video_processor.display_frame(packet.image)
+        if packet.hand_landmarks is not None:
+            with self.video_processor.surface_lock:
+                image = self.state_manager.process_hand(
+                    None if headless else packet.image, packet.hand_landmarks, self.video_processor,
+                    self.cursor_control, self.click_handler
+                )
+            if not headless:
+                packet.image = image
+        elif packet.new_result:
+            self.state_manager.reset()
+            self.cursor_control.reset()
+            if not headless:
+                self.video_processor.draw_no_hand_message(packet.image)
+        return packet
+
+    def _render(self, packet):
+        packet.rendered = not self.video_processor.headless and self.video_processor.should_render()
+        with self.video_processor.surface_lock:
+            if packet.rendered:
+                packet.image = self.video_processor.draw_interface(
+                    packet.image, self.state_manager, self.click_handler, show=False
+                )
+            else:
+                self.video_processor.update_interface_state(packet.image)
+        return packet
+
+    def _on_error(self, stage_name, error):
+        if self.error is None:
+            self.error = (stage_name, error)
+        self.stop_event.set()
+
+    def results(self):
+        output_queue = self.queues[-1]
+        while not self.stop_event.is_set():
+            try:
+                packet = output_queue.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if packet is None:
+                break
+
+            heapq.heappush(self.pending, (packet.sequence, packet))
+            while self.pending and self.pending[0][0] == self.next_sequence:
+                _, ready = heapq.heappop(self.pending)
+                self.next_sequence += 1
+                yield ready
+
+        if self.error is not None:
+            stage_name, error = self.error
+            raise RuntimeError(f"pipeline stage '{stage_name}' failed") from error
+
+    def stop(self):
+        self.stop_event.set()
+        self.capture_thread.join(timeout=1.0)
+        for stage in self.stages:
+            stage.thread.join(timeout=1.0)
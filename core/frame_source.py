@@ -0,0 +1,124 @@
+import os
+import time
+import cv2
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+
+class CameraSource:
+    def __init__(self, index=0, fps=60):
+        self.cap = cv2.VideoCapture(index)
+        self.cap.set(cv2.CAP_PROP_FPS, fps)
+        self.realtime = True
+        self.mirrored = False
+
+    def frame_size(self):
+        _, image = self.cap.read()
+        height, width = image.shape[:2]
+        return width, height
+
+    def read(self):
+        success, image = self.cap.read()
+        return success, image, time.time()
+
+    def is_opened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+class ReplaySource:
+    def __init__(self, realtime=True):
+        self.realtime = realtime
+        self.mirrored = False
+        self.start_time = None
+        self.finished = False
+
+    def pace(self, timestamp):
+        if not self.realtime:
+            return
+        now = time.perf_counter()
+        if self.start_time is None:
+            self.start_time = now - timestamp
+            return
+        delay = self.start_time + timestamp - now
+        if delay > 0:
+            time.sleep(delay)
+
+    def is_opened(self):
+        return not self.finished
+
+class VideoFileSource(ReplaySource):
+    def __init__(self, path, realtime=True):
+        super().__init__(realtime)
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Cannot open video file: {path}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frame_index = 0
+
+    def frame_size(self):
+        width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        return width, height
+
+    def read(self):
+        if self.finished:
+            return False, None, None
+        success, image = self.cap.read()
+        if not success:
+            self.finished = True
+            return False, None, None
+
+        timestamp = self.frame_index / self.fps
+        self.frame_index += 1
+        self.pace(timestamp)
+        return True, image, timestamp
+
+    def release(self):
+        self.finished = True
+        self.cap.release()
+
+class ImageDirectorySource(ReplaySource):
+    def __init__(self, path, fps=30.0, realtime=True):
+        super().__init__(realtime)
+        self.path = path
+        self.fps = fps
+        self.files = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        if not self.files:
+            raise IOError(f"No images found in: {path}")
+        self.frame_index = 0
+
+    def frame_size(self):
+        height, width = cv2.imread(self.files[0]).shape[:2]
+        return width, height
+
+    def read(self):
+        if self.frame_index >= len(self.files):
+            self.finished = True
+            return False, None, None
+
+        image = cv2.imread(self.files[self.frame_index])
+        timestamp = self.frame_index / self.fps
+        self.frame_index += 1
+        if image is None:
+            print(f"Failed to read image: {self.files[self.frame_index - 1]}")
+            return False, None, None
+
+        self.pace(timestamp)
+        return True, image, timestamp
+
+    def release(self):
+        self.finished = True
+
+def open_source(spec, realtime=True, fps=30.0):
+    if spec is None:
+        return CameraSource(0)
+    if isinstance(spec, int) or str(spec).isdigit():
+        return CameraSource(int(spec))
+    if os.path.isdir(spec):
+        return ImageDirectorySource(spec, fps=fps, realtime=realtime)
+    return VideoFileSource(spec, realtime=realtime)
@@ -0,0 +1,71 @@
+import math
+import numpy as np
+from .history_manager import INDEX, MIDDLE
+
+FEATURES = (
+    'history_length', 'size_history_length', 'movement', 'size_stable', 'size_change_mean',
+    'index_y_max_up', 'index_y_max_down', 'middle_y_max_up', 'middle_y_max_down',
+    'index_y_recent_up', 'index_y_recent_down', 'middle_y_recent_up', 'middle_y_recent_down',
+    'index_y_change', 'middle_y_change', 'scroll_divergence', 'index_x_travel', 'middle_x_travel',
+    'fingers_x_gap', 'fingers_y_gap', 'finger_distance', 'has_last_distance', 'distance_change',
+    'has_last_position', 'swipe_shift_x', 'swipe_shift_y', 'swipe_direction', 'pinky_shift_y', 'swipe_armed',
+    'time_since_tap', 'hold_pending', 'hold_elapsed',
+)
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURES)}
+
+class GestureFeatures:
+    def __init__(self, cooldown_groups=()):
+        # one cooldown counter per group is appended after the features, so rules can gate on them
+        self.index = dict(FEATURE_INDEX)
+        for i, group in enumerate(cooldown_groups):
+            self.index[group + '_cooldown'] = len(FEATURES) + i
+        self.vector = np.zeros(len(self.index))
+        self.cooldowns = self.vector[len(FEATURES):]
+
+    def extract(self, history, tips, last_position, gesture, now):
+        index_tip, middle_tip, ring_tip, pinky_tip = tips
+        f = self.vector
+
+        f[0] = len(history)
+        f[1] = len(history.size_history)
+        f[2] = history.get_movement_amount()
+        f[3] = history.is_size_stable()
+        f[4] = history.size_change_mean()
+        f[5] = history.y_diff_max[INDEX]
+        f[6] = history.y_diff_min[INDEX]
+        f[7] = history.y_diff_max[MIDDLE]
+        f[8] = history.y_diff_min[MIDDLE]
+        f[9] = history.y_recent_max[INDEX]
+        f[10] = history.y_recent_min[INDEX]
+        f[11] = history.y_recent_max[MIDDLE]
+        f[12] = history.y_recent_min[MIDDLE]
+        # oldest minus newest, positive when the finger moved up the frame
+        f[13] = -history.y_travel[INDEX]
+        f[14] = -history.y_travel[MIDDLE]
+        f[15] = abs(f[13] - f[14])
+        f[16] = history.x_travel[INDEX]
+        f[17] = history.x_travel[MIDDLE]
+
+        f[18] = abs(index_tip[0] - middle_tip[0])
+        f[19] = abs(index_tip[1] - middle_tip[1])
+        distance = math.hypot(index_tip[0] - middle_tip[0], index_tip[1] - middle_tip[1])
+        f[20] = distance
+        f[21] = gesture.last_distance is not None
+        f[22] = distance - gesture.last_distance if gesture.last_distance is not None else 0.0
+
+        f[23] = last_position is not None
+        if last_position is not None:
+            f[24] = min(abs(tip[0] - last_position[0]) for tip in (index_tip, middle_tip, ring_tip))
+            f[25] = max(abs(tip[1] - last_position[1]) for tip in (index_tip, middle_tip, ring_tip))
+            f[26] = index_tip[0] - last_position[0]
+            f[27] = abs(pinky_tip[1] - last_position[1])
+        else:
+            f[24:28] = 0.0
+        f[28] = gesture.swipe_detected
+
+        f[29] = now - gesture.last_tap_time
+        f[30] = (gesture.index_click_detected and gesture.index_hold_start_time is not None
+                 and not gesture.index_hold_triggered)
+        f[31] = now - gesture.index_hold_start_time if gesture.index_hold_start_time is not None else 0.0
+
+        return f
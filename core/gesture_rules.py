@@ -0,0 +1,147 @@
+import json
+import numpy as np
+from .gesture_features import GestureFeatures
+
+OPERATORS = ('>', '>=', '<', '<=', '==')
+
+def load_rule_spec(path):
+    with open(path) as f:
+        return json.load(f)
+
+class GestureRules:
+    # rules are compiled into one row of open (lower, upper) bounds per condition set;
+    # a rule matches when any of its rows matches for `window` consecutive frames
+    def __init__(self, spec, actions):
+        self.constants = spec.get('constants', {})
+        groups = spec.get('groups', {})
+        rules = sorted(enumerate(spec['gestures']), key=lambda item: (item[1].get('priority', 0), item[0]))
+        rules = [rule for _, rule in rules]
+
+        self.names = [rule['name'] for rule in rules]
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Gesture rule names must be unique")
+
+        self.cooldown_groups = []
+        for rule in rules:
+            if rule.get('cooldown'):
+                group = rule.get('cooldown_group', rule['name'])
+                if group not in self.cooldown_groups:
+                    self.cooldown_groups.append(group)
+
+        self.features = GestureFeatures(self.cooldown_groups)
+        feature_count = len(self.features.index)
+
+        lower_rows, upper_rows, row_starts = [], [], []
+        self.emits = []
+        self.actions = []
+        self.windows = np.ones(len(rules), dtype=np.int32)
+        self.cooldown_slots = np.full(len(rules), -1, dtype=np.int32)
+        self.cooldown_values = np.zeros(len(rules))
+        self.exclusions = np.zeros((len(rules), len(rules)), dtype=bool)
+
+        for i, rule in enumerate(rules):
+            shared = []
+            for group in rule.get('use', []):
+                if group not in groups:
+                    raise ValueError(f"Gesture rule {rule['name']} uses unknown group: {group}")
+                shared += groups[group]
+
+            if rule.get('cooldown'):
+                slot = self.cooldown_groups.index(rule.get('cooldown_group', rule['name']))
+                self.cooldown_slots[i] = slot
+                self.cooldown_values[i] = self.resolve(rule['cooldown'])
+                shared = shared + [[self.cooldown_groups[slot] + '_cooldown', '==', 0]]
+
+            alternatives = rule.get('any', [rule.get('when', [])])
+            row_starts.append(len(lower_rows))
+            for conditions in alternatives:
+                lower = np.full(feature_count, -np.inf)
+                upper = np.full(feature_count, np.inf)
+                self.compile_conditions(rule['name'], shared + conditions, lower, upper)
+                lower_rows.append(lower)
+                upper_rows.append(upper)
+
+            self.windows[i] = self.resolve(rule.get('window', 1))
+            self.emits.append(rule.get('emit', rule['name']))
+
+            action = rule.get('action')
+            if action is not None and action not in actions:
+                raise ValueError(f"Gesture rule {rule['name']} has unknown action: {action}")
+            self.actions.append(actions[action] if action is not None else None)
+
+            if rule.get('exclusive', True):
+                self.exclusions[i, i + 1:] = True
+            for other in rule.get('excludes', []):
+                if other not in self.names:
+                    raise ValueError(f"Gesture rule {rule['name']} excludes unknown rule: {other}")
+                j = self.names.index(other)
+                self.exclusions[i, j] = self.exclusions[j, i] = True
+
+        self.lower = np.array(lower_rows)
+        self.upper = np.array(upper_rows)
+        self.row_starts = np.array(row_starts, dtype=np.intp)
+
+        self.streaks = np.zeros(len(rules), dtype=np.int32)
+        self._inside = np.zeros(self.lower.shape, dtype=bool)
+        self._below = np.zeros(self.lower.shape, dtype=bool)
+        self._row_matched = np.zeros(len(lower_rows), dtype=bool)
+        self._matched = np.zeros(len(rules), dtype=bool)
+        self._ready = np.zeros(len(rules), dtype=bool)
+        self._suppressed = np.zeros(len(rules), dtype=bool)
+
+    def resolve(self, value):
+        if isinstance(value, str):
+            sign = -1 if value.startswith('-') else 1
+            name = value.lstrip('-').lstrip('$')
+            if name not in self.constants:
+                raise ValueError(f"Unknown gesture constant: {name}")
+            return sign * self.constants[name]
+        return value
+
+    def compile_conditions(self, rule_name, conditions, lower, upper):
+        for feature, op, value in conditions:
+            if feature not in self.features.index:
+                raise ValueError(f"Gesture rule {rule_name} uses unknown feature: {feature}")
+            if op not in OPERATORS:
+                raise ValueError(f"Gesture rule {rule_name} uses unknown operator: {op}")
+            i = self.features.index[feature]
+            value = float(self.resolve(value))
+            # >=, <= and == widen the open interval by one ulp
+            if op in ('>', '>=', '=='):
+                bound = value if op == '>' else np.nextafter(value, -np.inf)
+                lower[i] = max(lower[i], bound)
+            if op in ('<', '<=', '=='):
+                bound = value if op == '<' else np.nextafter(value, np.inf)
+                upper[i] = min(upper[i], bound)
+
+    def match(self, features):
+        np.less(self.lower, features, out=self._inside)
+        np.less(features, self.upper, out=self._below)
+        self._inside &= self._below
+        np.logical_and.reduce(self._inside, axis=1, out=self._row_matched)
+        np.logical_or.reduceat(self._row_matched, self.row_starts, out=self._matched)
+
+        self.streaks += 1
+        self.streaks *= self._matched
+        np.greater_equal(self.streaks, self.windows, out=self._ready)
+
+        # only matching rules are walked, so the loop is as long as the number of candidates
+        fired = []
+        self._suppressed[:] = False
+        for i in np.flatnonzero(self._ready).tolist():
+            if self._suppressed[i]:
+                continue
+            fired.append(i)
+            self._suppressed |= self.exclusions[i]
+            self.streaks[i] = 0
+            if self.cooldown_slots[i] >= 0:
+                self.features.cooldowns[self.cooldown_slots[i]] = self.cooldown_values[i]
+        return fired
+
+    def update_cooldowns(self):
+        cooldowns = self.features.cooldowns
+        np.subtract(cooldowns, 1, out=cooldowns, where=cooldowns > 0)
+
+    def reset(self):
+        self.features.cooldowns[:] = 0
+        self.streaks[:] = 0
@@ -1,130 +1,145 @@
-from collections import deque
+import math
 import numpy as np
+from .ring_buffer import RingBuffer
+
+# columns of y_history; x_history only keeps INDEX and MIDDLE
+INDEX = 0
+MIDDLE = 1
+RING = 2
+PINKY = 3
 
 class HistoryManager:
-    def __init__(self):
-        self.y_history = {
-            'index': deque(maxlen=12),
-            'middle': deque(maxlen=12),
-            'ring': deque(maxlen=12),
-            'pinky': deque(maxlen=12)
-        }
-        
-        self.x_history = {
-            'index': deque(maxlen=12),
-            'middle': deque(maxlen=12)
-        }
-        
-        self.size_history = deque(maxlen=6)
-        self.size_change_history = deque(maxlen=50)
-        
-        self.finger_tips_history = [deque(maxlen=3) for _ in range(5)]
-        
-        self.hand_center_history = deque(maxlen=6)
-        
+    def __init__(self, history_length=12, recent_window=2):
+        self.history_length = history_length
+        self.recent_window = recent_window
+
+        self.y_history = RingBuffer(history_length, (4,))
+        self.x_history = RingBuffer(history_length, (2,))
+        self.y_diffs = RingBuffer(history_length - 1, (4,))
+
+        # maintained on every update so gesture checks only read them
+        self.y_diff_max = np.zeros(4)
+        self.y_diff_min = np.zeros(4)
+        self.y_recent_max = np.zeros(4)
+        self.y_recent_min = np.zeros(4)
+        self.y_travel = np.zeros(4)
+        self.x_travel = np.zeros(2)
+
+        self.size_history = RingBuffer(6)
+        self.size_changes = RingBuffer(5)
+        self.size_change_history = RingBuffer(50)
+        self._abs_size_change_sum = 0.0
+
+        self.finger_tips_history = RingBuffer(3, (5, 2), track_sum=True)
+
+        self.hand_center_history = RingBuffer(6, (2,))
+        self.movement = 0.0
+
         self.threshold_y = 3.5
         self.threshold_size = 0.04
         self.threshold_size_change = 0.008
-        
-        self._cached_movement = None
-        self._last_cache_time = 0
-        self._cache_valid_frames = 2
-        self._frame_counter = 0
+
+        self._y_sample = np.zeros(4)
+        self._x_sample = np.zeros(2)
+        self._y_diff = np.zeros(4)
         self._last_size_smooth = None
-        
+
     def update_positions(self, index_tip, middle_tip, ring_tip, pinky_tip, hand_size, hand_center):
-        self._frame_counter += 1
-        
-        self.y_history['index'].append(index_tip[1])
-        self.y_history['middle'].append(middle_tip[1])
-        self.y_history['ring'].append(ring_tip[1])
-        self.y_history['pinky'].append(pinky_tip[1])
-        
-        self.x_history['index'].append(index_tip[0])
-        self.x_history['middle'].append(middle_tip[0])
-        
+        y_sample = self._y_sample
+        y_sample[INDEX] = index_tip[1]
+        y_sample[MIDDLE] = middle_tip[1]
+        y_sample[RING] = ring_tip[1]
+        y_sample[PINKY] = pinky_tip[1]
+        self._x_sample[INDEX] = index_tip[0]
+        self._x_sample[MIDDLE] = middle_tip[0]
+
+        if len(self.y_history):
+            np.subtract(y_sample, self.y_history.newest(), out=self._y_diff)
+            self.y_diffs.append(self._y_diff)
+        self.y_history.append(y_sample)
+        self.x_history.append(self._x_sample)
+
+        if len(self.y_diffs):
+            diffs = self.y_diffs.view()
+            np.maximum.reduce(diffs, axis=0, out=self.y_diff_max)
+            np.minimum.reduce(diffs, axis=0, out=self.y_diff_min)
+            recent = diffs[-self.recent_window:]
+            np.maximum.reduce(recent, axis=0, out=self.y_recent_max)
+            np.minimum.reduce(recent, axis=0, out=self.y_recent_min)
+        np.subtract(self.y_history.newest(), self.y_history.oldest(), out=self.y_travel)
+        np.subtract(self.x_history.newest(), self.x_history.oldest(), out=self.x_travel)
+
         if self._last_size_smooth is None:
             self._last_size_smooth = hand_size
         else:
             smoothing = 0.7
             hand_size = hand_size * (1 - smoothing) + self._last_size_smooth * smoothing
             self._last_size_smooth = hand_size
-        
+
+        if len(self.size_history):
+            previous_size = self.size_history.newest()
+            size_change = (hand_size - previous_size) / previous_size
+            if self.size_changes.is_full():
+                self._abs_size_change_sum -= abs(self.size_changes.oldest())
+            self.size_changes.append(size_change)
+            self._abs_size_change_sum += abs(size_change)
+            if self.size_changes.head == 0:
+                self._abs_size_change_sum = float(np.abs(self.size_changes.view()).sum())
+            if abs(size_change) > self.threshold_size_change:
+                self.size_change_history.append(abs(size_change))
         self.size_history.append(hand_size)
-        self.hand_center_history.append(np.array(hand_center))
-        
-        if self._frame_counter - self._last_cache_time > self._cache_valid_frames:
-            self._cached_movement = None
-        
-        if len(self.size_history) >= 2:
-            size_change = abs(hand_size - list(self.size_history)[-2]) / list(self.size_history)[-2]
-            if size_change > self.threshold_size_change:
-                self.size_change_history.append(size_change)
-    
+
+        self.hand_center_history.append(hand_center)
+        newest_center = self.hand_center_history.newest()
+        oldest_center = self.hand_center_history.oldest()
+        self.movement = math.hypot(newest_center[0] - oldest_center[0], newest_center[1] - oldest_center[1])
+
+    def __len__(self):
+        return len(self.y_history)
+
     def get_size_changes(self):
-        if len(self.size_history) < 2:
-            return np.array([])
-        
-        size_array = np.array(list(self.size_history))
-        changes = np.diff(size_array) / size_array[:-1]
-        return changes
-    
+        return self.size_changes.view()
+
+    def size_change_mean(self):
+        if not len(self.size_changes):
+            return 0.0
+        return self._abs_size_change_sum / len(self.size_changes)
+
     def is_size_stable(self):
-        if len(self.size_history) < 2:
-            return True
-            
-        recent_changes = list(self.size_history)[-4:]
-        if len(recent_changes) < 2:
+        if len(self.size_changes) < 1:
             return True
-            
-        changes = np.diff(recent_changes) / np.array(recent_changes[:-1])
-        return np.mean(np.abs(changes)) <= self.threshold_size
-    
+
+        # the last four sizes, i.e. the last three changes
+        recent_changes = self.size_changes.view()[-3:]
+        return np.abs(recent_changes).mean() <= self.threshold_size
+
     def get_movement_amount(self):
-        if len(self.hand_center_history) < 2:
-            return 0
-            
-        if (self._cached_movement is not None and 
-            self._frame_counter - self._last_cache_time <= self._cache_valid_frames):
-            return self._cached_movement
-            
-        movement = np.linalg.norm(self.hand_center_history[-1] - self.hand_center_history[0])
-        
-        self._cached_movement = movement
-        self._last_cache_time = self._frame_counter
-        
-        return movement
-    
+        return self.movement
+
     def update_finger_tips(self, finger_tips):
-        for i, tip in enumerate(finger_tips):
-            self.finger_tips_history[i].append(np.array(tip))
-    
+        self.finger_tips_history.append(finger_tips)
+
     def get_finger_movement(self, finger_index):
-        if len(self.finger_tips_history[finger_index]) < 2:
+        if len(self.finger_tips_history) < 2:
             return 0
         return np.linalg.norm(
-            self.finger_tips_history[finger_index][-1] - 
-            self.finger_tips_history[finger_index][0]
+            self.finger_tips_history.newest()[finger_index] -
+            self.finger_tips_history.oldest()[finger_index]
         )
-    
+
     def get_average_movement(self):
         movements = [self.get_finger_movement(i) for i in range(5)]
         return np.mean([m for m in movements if m > 0]) if movements else 0
-    
+
     def reset(self):
-        for collection in [self.y_history, self.x_history]:
-            for deq in collection.values():
-                deq.clear()
-        
-        self.size_history.clear()
-        self.size_change_history.clear()
-        
-        for history in self.finger_tips_history:
+        for history in (self.y_history, self.x_history, self.y_diffs, self.size_history, self.size_changes,
+                        self.size_change_history, self.finger_tips_history, self.hand_center_history):
             history.clear()
-        
-        self.hand_center_history.clear()
-        
-        self._cached_movement = None
-        self._last_cache_time = 0
-        self._frame_counter = 0
-        self._last_size_smooth = None
\ No newline at end of file
+
+        for stat in (self.y_diff_max, self.y_diff_min, self.y_recent_max, self.y_recent_min,
+                     self.y_travel, self.x_travel):
+            stat[...] = 0
+
+        self._abs_size_change_sum = 0.0
+        self.movement = 0.0
+        self._last_size_smooth = None
@@ -0,0 +1,138 @@
+import json
+import os
+import time
+import numpy as np
+from api import HandAPI, SurfaceAPI
+
+MAGIC = b'HNDYLMK1'
+HEADER_DTYPE = np.dtype([('magic', 'S8'), ('version', '<u4'), ('width', '<u4'), ('height', '<u4'), ('reserved', '<u4')])
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('handedness', 'u1'),
+    ('surface_locked', 'u1'),
+    ('landmarks', '<f4', (21, 3)),
+])
+VERSION = 1
+
+LEFT_HAND = 0
+RIGHT_HAND = 1
+NO_HAND = 255
+
+def metadata_path(path):
+    return path + '.json'
+
+class LandmarkRecorder:
+    def __init__(self, path, width, height):
+        self.path = path
+        self.file = open(path, 'wb')
+        header = np.zeros(1, dtype=HEADER_DTYPE)
+        header['magic'] = MAGIC
+        header['version'] = VERSION
+        header['width'] = width
+        header['height'] = height
+        self.file.write(header.tobytes())
+
+        self.record = np.zeros(1, dtype=RECORD_DTYPE)
+        self.frame_count = 0
+        self.surface_contour = None
+
+    def record_frame(self, timestamp, hand_landmarks, surface_api):
+        record = self.record[0]
+        record['timestamp'] = timestamp if timestamp is not None else time.time()
+        record['surface_locked'] = surface_api.is_surface_locked
+
+        if hand_landmarks is None:
+            record['handedness'] = NO_HAND
+            record['landmarks'] = np.nan
+        else:
+            landmarks = np.asarray(hand_landmarks, dtype=np.float32)
+            # the same wrist / middle MCP rule HandAPI.get_hand_info uses for the label
+            record['handedness'] = LEFT_HAND if landmarks[0, 0] < landmarks[9, 0] else RIGHT_HAND
+            record['landmarks'] = landmarks
+
+        if surface_api.is_surface_locked and surface_api.surface_contour is not None:
+            self.surface_contour = surface_api.surface_contour
+
+        self.file.write(self.record.tobytes())
+        self.frame_count += 1
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.close()
+        contour = None
+        if self.surface_contour is not None:
+            contour = self.surface_contour.reshape(-1, 2).tolist()
+        with open(metadata_path(self.path), 'w') as f:
+            json.dump({'frames': self.frame_count, 'surface_contour': contour}, f)
+
+class LandmarkRecording:
+    def __init__(self, path):
+        self.path = path
+        header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)
+        if len(header) == 0 or header['magic'][0] != MAGIC:
+            raise ValueError(f"Not a landmark recording: {path}")
+        if header['version'][0] != VERSION:
+            raise ValueError(f"Unsupported landmark recording version: {header['version'][0]}")
+        self.width = int(header['width'][0])
+        self.height = int(header['height'][0])
+
+        frame_count = (os.path.getsize(path) - HEADER_DTYPE.itemsize) // RECORD_DTYPE.itemsize
+        if frame_count > 0:
+            self.records = np.memmap(path, dtype=RECORD_DTYPE, mode='r',
+                                     offset=HEADER_DTYPE.itemsize, shape=(frame_count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+        self.timestamps = self.records['timestamp']
+        self.handedness = self.records['handedness']
+        self.surface_locked = self.records['surface_locked']
+        self.landmarks = self.records['landmarks']
+
+        self.surface_contour = None
+        if os.path.exists(metadata_path(path)):
+            with open(metadata_path(path)) as f:
+                contour = json.load(f).get('surface_contour')
+            if contour:
+                self.surface_contour = np.array(contour, dtype=np.int32).reshape(-1, 1, 2)
+
+    def __len__(self):
+        return len(self.records)
+
+class LandmarkReplay:
+    def __init__(self, recording, surface_api=None):
+        self.recording = recording
+        self.width = recording.width
+        self.height = recording.height
+        self.surface_api = surface_api if surface_api is not None else SurfaceAPI()
+        self.hand_api = HandAPI(self.surface_api, load_model=False)
+        self.hand_api.image_width = self.width
+        self.hand_api.image_height = self.height
+        if recording.surface_contour is not None:
+            self.surface_api.surface_contour = recording.surface_contour
+        self.timestamp = 0.0
+
+    def draw_hand_status(self, image, hand_status):
+        pass
+
+    def clock(self):
+        return self.timestamp
+
+    def run(self, state_manager, cursor_control, click_handler, start=0, stop=None):
+        state_manager.gesture.clock = self.clock
+        recording = self.recording
+        stop = len(recording) if stop is None else min(stop, len(recording))
+
+        started = time.perf_counter()
+        for i in range(start, stop):
+            self.timestamp = float(recording.timestamps[i])
+            self.surface_api.is_surface_locked = bool(recording.surface_locked[i])
+
+            if recording.handedness[i] == NO_HAND:
+                state_manager.reset()
+                cursor_control.reset()
+                continue
+
+            state_manager.process_hand(None, recording.landmarks[i], self, cursor_control, click_handler)
+
+        return stop - start, time.perf_counter() - started
@@ -0,0 +1,58 @@
+import cv2
+
+class MotionAnalyzer:
+    # one diff per frame on a downscaled luma image, shared by everything that needs to know whether the scene moved
+    def __init__(self, levels=2, pixel_threshold=25):
+        self.levels = levels
+        self.pixel_threshold = pixel_threshold
+
+        self.shape = None
+        self.current = None
+        self.previous = None
+        self.diff = None
+        self.motion_map = None
+        self.has_previous = False
+
+        self.change_percent = 0.0
+        self.mean_diff = 0.0
+
+    def reset_buffers(self, shape):
+        self.shape = shape[:2]
+        self.current = None
+        self.previous = None
+        self.diff = None
+        self.motion_map = None
+        self.has_previous = False
+
+    def update(self, image):
+        if self.shape != image.shape[:2]:
+            self.reset_buffers(image.shape)
+
+        # уровень гауссовой пирамиды: дёшево и без алиасинга, который дал бы простой шаг по пикселям
+        small = image
+        for _ in range(self.levels):
+            small = cv2.pyrDown(small)
+        # цвет переводим в яркость уже на уменьшенном кадре
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+        # храним только уменьшенный предыдущий кадр, полная копия не нужна
+        self.previous, self.current = self.current, small
+        self.has_previous = self.previous is not None
+        if not self.has_previous:
+            self.change_percent = 0.0
+            self.mean_diff = 0.0
+            return self
+
+        self.diff = cv2.absdiff(self.current, self.previous, dst=self.diff)
+        _, self.motion_map = cv2.threshold(self.diff, self.pixel_threshold, 255, cv2.THRESH_BINARY,
+                                           dst=self.motion_map)
+        self.change_percent = cv2.countNonZero(self.motion_map) / self.motion_map.size * 100
+        self.mean_diff = cv2.mean(self.diff)[0]
+        return self
+
+    def is_significant(self, change_threshold):
+        return self.change_percent > change_threshold
+
+    def reset(self):
+        self.shape = None
@@ -0,0 +1,168 @@
+import csv
+import json
+import threading
+import time
+import numpy as np
+
+class _Span:
+    __slots__ = ('monitor', 'name', 'start')
+
+    def __init__(self, monitor, name):
+        self.monitor = monitor
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.monitor.record(self.name, time.perf_counter() - self.start)
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+NULL_SPAN = _NullSpan()
+
+class RollingWindow:
+    __slots__ = ('values', 'count', 'last')
+
+    def __init__(self, size):
+        self.values = np.zeros(size, dtype=np.float64)
+        self.count = 0
+        self.last = 0.0
+
+    def add(self, value):
+        self.values[self.count % len(self.values)] = value
+        self.count += 1
+        self.last = value
+
+    def samples(self):
+        return self.values[:min(self.count, len(self.values))]
+
+class PerfSink:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'w', newline='')
+        self.is_csv = path.lower().endswith('.csv')
+        self.writer = None
+        self.columns = None
+
+    def write(self, row):
+        if not self.is_csv:
+            self.file.write(json.dumps(row) + '\n')
+            return
+        if self.writer is None:
+            self.columns = list(row)
+            self.writer = csv.DictWriter(self.file, fieldnames=self.columns, extrasaction='ignore')
+            self.writer.writeheader()
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+class PerfMonitor:
+    def __init__(self, enabled=True, window=240, sink=None, show_hud=False):
+        self.enabled = enabled
+        self.window = window
+        self.sink = sink
+        self.show_hud = show_hud
+
+        self.spans = {}
+        self.stages = {}
+        self.frame_times = RollingWindow(window)
+        self.frame_index = 0
+        self.frame_start = None
+        self.frame_stages = {}
+        self.dropped_frames = 0
+        # spans are recorded from the pipeline stages and the input dispatcher, not only the main loop
+        self.lock = threading.Lock()
+
+        self.stats_interval = 15
+        self._stats_frame = -1
+        self._stats = {}
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        span = self.spans.get(name)
+        if span is None:
+            span = self.spans[name] = _Span(self, name)
+        return span
+
+    def record(self, name, seconds):
+        with self.lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                stage = self.stages[name] = RollingWindow(self.window)
+            stage.add(seconds * 1000)
+            self.frame_stages[name] = self.frame_stages.get(name, 0.0) + seconds * 1000
+
+    def end_frame(self, dropped_frames=0):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self.frame_start is not None:
+            self.frame_times.add((now - self.frame_start) * 1000)
+        self.frame_start = now
+        self.dropped_frames = dropped_frames
+
+        with self.lock:
+            row = None
+            if self.sink is not None:
+                row = {'frame': self.frame_index, 'time': time.time(), 'dropped': dropped_frames}
+                for name in self.stages:
+                    row[name] = round(self.frame_stages.get(name, 0.0), 4)
+            self.frame_stages.clear()
+        if row is not None:
+            self.sink.write(row)
+
+        self.frame_index += 1
+
+    def fps(self):
+        samples = self.frame_times.samples()
+        if len(samples) == 0:
+            return 0.0
+        mean = samples.mean()
+        return 1000.0 / mean if mean > 0 else 0.0
+
+    def stage_stats(self):
+        if self._stats_frame >= 0 and self.frame_index - self._stats_frame < self.stats_interval:
+            return self._stats
+        stats = {}
+        with self.lock:
+            stages = [(name, stage.last, stage.samples().copy()) for name, stage in self.stages.items()]
+        for name, last, samples in stages:
+            if len(samples) == 0:
+                continue
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+            stats[name] = {'last_ms': last, 'mean_ms': float(samples.mean()),
+                           'p50_ms': float(p50), 'p95_ms': float(p95), 'p99_ms': float(p99)}
+        self._stats = stats
+        self._stats_frame = self.frame_index
+        return stats
+
+    def histogram(self, name, bins=20, max_ms=None):
+        with self.lock:
+            stage = self.stages.get(name)
+            if stage is None or stage.count == 0:
+                return np.zeros(bins, dtype=np.int64), np.zeros(bins + 1)
+            samples = stage.samples().copy()
+        upper = max_ms if max_ms is not None else max(samples.max(), 1e-3)
+        return np.histogram(samples, bins=bins, range=(0.0, upper))
+
+    def summary(self):
+        return {'frames': self.frame_index, 'fps': self.fps(), 'dropped_frames': self.dropped_frames,
+                'stages': self.stage_stats()}
+
+    def close(self):
+        if self.sink is not None:
+            self.sink.close()
+            self.sink = None
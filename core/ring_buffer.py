@@ -0,0 +1,56 @@
+import numpy as np
+
+class RingBuffer:
+    # every sample is written twice, at head and head + capacity, so the
+    # last `count` samples are always one contiguous slice of `data`
+    def __init__(self, capacity, shape=(), dtype=np.float64, track_sum=False):
+        self.capacity = capacity
+        self.data = np.zeros((2 * capacity,) + tuple(shape), dtype=dtype)
+        self.head = 0
+        self.count = 0
+        self.sum = np.zeros(shape, dtype=np.float64) if track_sum else None
+
+    def append(self, value):
+        head = self.head
+        if self.sum is not None:
+            if self.count == self.capacity:
+                self.sum -= self.data[head]
+            self.sum += value
+
+        self.data[head] = value
+        self.data[head + self.capacity] = self.data[head]
+        self.head = head + 1 if head + 1 < self.capacity else 0
+        if self.count < self.capacity:
+            self.count += 1
+
+        if self.sum is not None and self.head == 0:
+            # resync once per lap so float error cannot accumulate
+            np.sum(self.view(), axis=0, out=self.sum)
+
+    def view(self):
+        end = self.head + self.capacity
+        return self.data[end - self.count:end]
+
+    def newest(self):
+        return self.data[self.head + self.capacity - 1]
+
+    def oldest(self):
+        return self.data[self.head + self.capacity - self.count]
+
+    def mean(self):
+        return self.sum / self.count
+
+    def is_full(self):
+        return self.count == self.capacity
+
+    def clear(self):
+        self.head = 0
+        self.count = 0
+        if self.sum is not None:
+            self.sum[...] = 0
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.view())
@@ -1,135 +1,159 @@
-from .gesture_handler import GestureHandler
-from .history_manager import HistoryManager
-import pyautogui
-from additional.utils import (
-    calculate_hand_size, smooth_finger_tips, update_state,
-    calculate_hand_center, draw_size_change_graph
-)
+import numpy as np
+from .gesture_handler import GestureHandler, DEFAULT_GESTURE_RULES
+from .history_manager import HistoryManager, INDEX
+from gestures import ActionDispatcher
+from api.hand_tracker import HandTracker
+from additional.utils import smooth_finger_tips, update_state, draw_size_change_graph
 
-class StateManager:
-    def __init__(self):
+GESTURE_MESSAGES = {
+    'rotate_right': "Rotate Right", 'rotate_left': "Rotate Left",
+    'swipe_right': "Swipe Right", 'swipe_left': "Swipe Left",
+    'four_finger_swipe_right': "Four Finger Right Swipe", 'four_finger_swipe_left': "Four Finger Left Swipe",
+    'scroll_down': "Down Scroll", 'scroll_up': "Up Scroll",
+    'zoom_out': "Zoom Out", 'zoom_in': "Zoom In",
+    'two_finger_click': "Click with Two Fingers", 'double_tap': "Double Tap",
+    'index_click': "Click with Index Finger", 'middle_click': "Click with Middle Finger",
+    'index_hold': "Index Hold",
+}
+
+class HandState:
+    # what the gesture logic remembers about one hand; allocated once per slot and reset, never rebuilt
+    def __init__(self, gesture_rules=DEFAULT_GESTURE_RULES):
         self.current_state = "Initializing"
         self.state_transition = {
             "Initializing": 0, "Hand at rest": 0, "Y changing, size stable": 0,
             "Y stable, size changing": 0, "Y changing, size changing": 0,
             "Hand off surface": 0
         }
-        self.state_transition_threshold = 2
-        
-        self.history = HistoryManager()
-        self.gesture = GestureHandler()
-        
         self.last_on_surface_position = None
-        self.cursor_stability_threshold = 2.0  
+
+        self.gesture = GestureHandler(rules_path=gesture_rules)
+        self.history = HistoryManager(recent_window=self.gesture.two_finger_click_window)
+
+        self.cursor_movement_enabled = True
+
+    def reset(self):
+        self.current_state = "Initializing"
+        self.history.reset()
+        self.gesture.reset()
+        self.last_on_surface_position = None
         self.cursor_movement_enabled = True
+
+class StateManager:
+    def __init__(self, gesture_rules=DEFAULT_GESTURE_RULES, dispatcher=None, max_hands=1):
+        self.dispatcher = dispatcher if dispatcher is not None else ActionDispatcher(threaded=False)
+        self.state_transition_threshold = 2
+
+        self.hands = [HandState(gesture_rules) for _ in range(max_hands)]
+        # рука, которая ведёт курсор и чьё состояние показывается на экране
+        self.hand = self.hands[0]
+        self.tracker = HandTracker(max_hands) if max_hands > 1 else None
+        self.pointer_id = None
+
         self.move_threshold = 12
-        
-        pyautogui.FAILSAFE = False
+
+    @property
+    def current_state(self):
+        return self.hand.current_state
+
+    @property
+    def history(self):
+        return self.hand.history
+
+    @property
+    def gesture(self):
+        return self.hand.gesture
+
+    @property
+    def last_on_surface_position(self):
+        return self.hand.last_on_surface_position
 
     def process_hand(self, image, hand_landmarks, video_processor, cursor_control, click_handler):
-        hand_info = video_processor.hand_api.get_hand_info(image, hand_landmarks)
-        smoothed_finger_tips = smooth_finger_tips(hand_info['finger_tips'], self.history.finger_tips_history)
-        hand_info['finger_tips'] = smoothed_finger_tips
+        if self.tracker is not None:
+            return self.process_hands(image, hand_landmarks, video_processor, cursor_control, click_handler)
+        hand_frame = video_processor.hand_api.get_hand_info(image, hand_landmarks)
+        return self._process_hand_frame(image, self.hand, hand_frame, True, video_processor, cursor_control,
+                                        click_handler)
+
+    def process_hands(self, image, detections, video_processor, cursor_control, click_handler):
+        tracker = self.tracker.update(detections)
+        for slot in np.flatnonzero(tracker.released | tracker.started).tolist():
+            self.hands[slot].reset()
+
+        slots = tracker.visible_slots()
+        if not slots:
+            return image
+
+        # курсор ведёт рука, которая отслеживается дольше всех; при смене руки курсор не должен прыгать
+        pointer = slots[0]
+        pointer_id = int(tracker.ids[pointer])
+        if pointer_id != self.pointer_id:
+            self.pointer_id = pointer_id
+            cursor_control.reset()
+        self.hand = self.hands[pointer]
+
+        for slot in slots:
+            hand_frame = video_processor.hand_api.get_tracked_hand_info(image, tracker, slot)
+            result = self._process_hand_frame(image, self.hands[slot], hand_frame, slot == pointer,
+                                              video_processor, cursor_control, click_handler)
+            if image is not None:
+                image = result
+        return image
+
+    def _process_hand_frame(self, image, hand, hand_frame, is_pointer, video_processor, cursor_control,
+                            click_handler):
+        hand_frame.finger_tips = smooth_finger_tips(hand_frame.finger_tips, hand.history.finger_tips_history)
         
-        index_finger_tip = hand_info['finger_tips'][1]
-        middle_finger_tip = hand_info['finger_tips'][2]
-        ring_finger_tip = hand_info['finger_tips'][3]
-        pinky_finger_tip = hand_info['finger_tips'][4]
+        _, index_finger_tip, middle_finger_tip, ring_finger_tip, pinky_finger_tip = hand_frame.tip_points()
         
         hand_on_surface = video_processor.surface_api.is_point_inside_contour(index_finger_tip)
-        hand_status = "On surface" if hand_on_surface else "Off surface"
-        video_processor.draw_hand_status(image, hand_status)
+        if image is not None and is_pointer:
+            hand_status = "On surface" if hand_on_surface else "Off surface"
+            video_processor.draw_hand_status(image, hand_status)
         
         if hand_on_surface and video_processor.surface_api.is_surface_locked:
             self._process_hand_on_surface(
-                index_finger_tip, middle_finger_tip, ring_finger_tip, pinky_finger_tip,
-                hand_info, hand_landmarks, video_processor, cursor_control, click_handler
+                hand, index_finger_tip, middle_finger_tip, ring_finger_tip, pinky_finger_tip,
+                hand_frame, is_pointer, video_processor, cursor_control, click_handler
             )
-            self.last_on_surface_position = index_finger_tip
+            hand.last_on_surface_position = index_finger_tip
         else:
-            self._process_hand_off_surface(cursor_control)
+            self._process_hand_off_surface(hand, is_pointer, cursor_control)
         
-        video_processor.surface_api.update_center(index_finger_tip)
-        return video_processor.hand_api.draw_hand(image, hand_info, hand_landmarks)
-
-    def _process_hand_on_surface(self, index_tip, middle_tip, ring_tip, pinky_tip, 
-                               hand_info, hand_landmarks, video_processor, cursor_control, click_handler):
-        current_size = calculate_hand_size(hand_landmarks)
-        hand_center = calculate_hand_center(hand_landmarks, video_processor.width, video_processor.height)
-        self.history.update_positions(index_tip, middle_tip, ring_tip, pinky_tip, current_size, hand_center)
+        if is_pointer:
+            video_processor.surface_api.update_center(index_finger_tip)
+        if image is None:
+            return None
+        return video_processor.hand_api.draw_hand(image, hand_frame)
+
+    def _process_hand_on_surface(self, hand, index_tip, middle_tip, ring_tip, pinky_tip,
+                               hand_frame, is_pointer, video_processor, cursor_control, click_handler):
+        hand.history.update_positions(index_tip, middle_tip, ring_tip, pinky_tip, hand_frame.size, hand_frame.center)
         
-        if not self._process_gestures(index_tip, middle_tip, ring_tip, pinky_tip, 
-                                    video_processor, cursor_control, click_handler):
+        if not self._process_gestures(hand, index_tip, middle_tip, ring_tip, pinky_tip,
+                                    video_processor, cursor_control, click_handler) and is_pointer:
             self._handle_cursor_movement(index_tip, video_processor, cursor_control)
         
-        self._update_state()
-        self.gesture.update_cooldowns()
+        self._update_state(hand)
+        hand.gesture.update_cooldowns()
 
-    def _process_gestures(self, index_tip, middle_tip, ring_tip, pinky_tip, 
+    def _process_gestures(self, hand, index_tip, middle_tip, ring_tip, pinky_tip,
                          video_processor, cursor_control, click_handler):
-        hand_movement = self.history.get_movement_amount()
-        is_moving_slowly = hand_movement < self.cursor_stability_threshold * 0.5
-        
-        result = self.gesture.check_rotate(self.history.x_history, self.history.y_history)
-        if result:
-            print(f"Rotate {result.capitalize()}")
-            return True
-            
-        result = self.gesture.check_swipe(index_tip, middle_tip, ring_tip, pinky_tip,
-                                        self.last_on_surface_position, is_moving_slowly)
-        if result:
-            if 'four_finger' in result:
-                print(f"{result.replace('_', ' ').title()} Swipe")
-            else:
-                print(f"Swipe {result.capitalize()}")
-            return True
-            
-        result = self.gesture.check_scroll(self.history.y_history, index_tip, middle_tip)
-        if result:
-            print(f"{result.capitalize()} Scroll")
-            return True
-            
-        result = self.gesture.check_zoom(index_tip, middle_tip)
-        if result:
-            print(f"Zoom {result.capitalize()}")
-            return True
-            
-        if hand_movement < self.cursor_stability_threshold:
-            if self.history.is_size_stable():
-                return self._handle_clicks(index_tip, middle_tip, click_handler, hand_movement)
-        else:
-            self._reset_click_state()
-            
-        return False
-
-    def _handle_clicks(self, index_tip, middle_tip, click_handler, hand_movement):
-        if self.gesture.check_two_finger_click(self.history.y_history):
-            print("Click with Two Fingers")
-            pyautogui.click(button='middle')
-            return True
-            
-        if self.gesture.two_finger_click_counter == 0:
-            if self.gesture.check_double_tap(self.history.y_history, self.history.size_history):
-                print("Double Tap")
-                pyautogui.doubleClick()
-                return True
-                
-            if self.gesture.check_index_finger_click(self.history.y_history, self.history.size_history):
-                print("Click with Index Finger")
-                pyautogui.click(button='left')
-                return True
-                
-            if self.gesture.check_middle_finger_click(self.history.y_history, self.history.size_history):
-                print("Click with Middle Finger")
-                pyautogui.click(button='right')
-                return True
-        
-        if self.gesture.check_index_finger_hold(hand_movement):
-            print("Index Hold")
-            pyautogui.mouseDown()
-            return True
-            
-        return False
+        gestures = hand.gesture.evaluate(hand.history, (index_tip, middle_tip, ring_tip, pinky_tip),
+                                         hand.last_on_surface_position)
+        for result in gestures:
+            print(GESTURE_MESSAGES.get(result) or result.replace('_', ' ').title())
+            if result == 'two_finger_click':
+                self.dispatcher.click(button='middle')
+            elif result == 'double_tap':
+                self.dispatcher.double_click()
+            elif result == 'index_click':
+                self.dispatcher.click(button='left')
+            elif result == 'middle_click':
+                self.dispatcher.click(button='right')
+            elif result == 'index_hold':
+                self.dispatcher.mouse_down()
+        return bool(gestures)
 
     def _handle_cursor_movement(self, index_tip, video_processor, cursor_control):
         if video_processor.surface_api.center is not None:
@@ -140,12 +164,12 @@ class StateManager:
                 video_processor.height
             )
 
-    def _update_state(self):
-        hand_movement = self.history.get_movement_amount()
-        size_stable = self.history.is_size_stable()
+    def _update_state(self, hand):
+        hand_movement = hand.history.get_movement_amount()
+        size_stable = hand.history.is_size_stable()
         
         new_state = "Hand at rest"
-        if abs(self.history.y_history['index'][0] - self.history.y_history['index'][-1]) > self.history.threshold_y:
+        if abs(hand.history.y_travel[INDEX]) > hand.history.threshold_y:
             if not size_stable:
                 new_state = "Y changing, size stable"
         elif hand_movement > self.move_threshold * 0.5:
@@ -153,26 +177,31 @@ class StateManager:
         elif size_stable:
             new_state = "Y stable, size changing"
             
-        self.current_state = update_state(new_state, self.state_transition, 
-                                        self.state_transition_threshold) or self.current_state
+        hand.current_state = update_state(new_state, hand.state_transition, 
+                                        self.state_transition_threshold) or hand.current_state
 
-    def _process_hand_off_surface(self, cursor_control):
+    def _process_hand_off_surface(self, hand, is_pointer, cursor_control):
         new_state = "Hand off surface"
-        self.current_state = update_state(new_state, self.state_transition, 
-                                        self.state_transition_threshold) or self.current_state
-        cursor_control.reset()
-
-    def _reset_click_state(self):
-        self.gesture.index_hold_start_time = None
-        self.gesture.index_hold_triggered = False
-        self.gesture.index_click_detected = False
+        hand.current_state = update_state(new_state, hand.state_transition, 
+                                        self.state_transition_threshold) or hand.current_state
+        if is_pointer:
+            cursor_control.reset()
 
     def reset(self):
-        self.current_state = "Initializing"
-        self.history.reset()
-        self.gesture.reset()
-        self.last_on_surface_position = None
-        self.cursor_movement_enabled = True
+        for hand in self.hands:
+            hand.reset()
+        if self.tracker is not None:
+            # кадр без рук: треки стареют, но идентичность переживает короткие пропуски
+            self.tracker.update(None)
+
+    def clear(self):
+        # рука перешла к другой камере: треки и жесты в координатах прежней камеры ей не принадлежат
+        for hand in self.hands:
+            hand.reset()
+        self.hand = self.hands[0]
+        self.pointer_id = None
+        if self.tracker is not None:
+            self.tracker.clear()
 
     def get_size_change_graph(self, image):
-        return draw_size_change_graph(image, self.history.size_change_history)
\ No newline at end of file
+        return draw_size_change_graph(image, self.history.size_change_history.view())
\ No newline at end of file
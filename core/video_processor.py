@@ -1,57 +1,143 @@
 import cv2
-import pyautogui
+import threading
+import time
 import numpy as np
 from api import HandAPI, SurfaceAPI
-from additional.utils import detect_significant_changes
+from gestures import ActionDispatcher
+from .capture_thread import CaptureThread
+from .frame_source import CameraSource
+from .motion_analyzer import MotionAnalyzer
+from .perf_monitor import PerfMonitor
+
+def mirror_frame(image, flip_matrix, grayscale=False):
+    if grayscale:
+        # frames stay single-channel until display_frame expands them
+        gray = cv2.flip(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY), 1)
+        return gray, gray
+
+    image = cv2.warpAffine(image, flip_matrix, (image.shape[1], image.shape[0]))
+    gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR), gray
 
 class VideoProcessor:
-    def __init__(self):
-        self.cap = cv2.VideoCapture(0)
-        self.cap.set(cv2.CAP_PROP_FPS, 60)
-        _, image = self.cap.read()
-        self.height, self.width = image.shape[:2]
-        self.screen_size = pyautogui.size()
+    def __init__(self, source=None, threaded_capture=False, capture_buffer_size=2, grayscale=False,
+                 roi_tracking=False, detect_every=1, adaptive_detection=False, hand_backend=None,
+                 dispatcher=None, max_hands=1, landmark_source=None):
+        self.source = source if source is not None else CameraSource(0)
+        self.width, self.height = self.source.frame_size()
+        self.dispatcher = dispatcher if dispatcher is not None else ActionDispatcher(threaded=False)
+        self.screen_size = self.dispatcher.screen_size()
         
         self.surface_api = SurfaceAPI(highlight_color=(200, 200, 200, 0.05))
-        self.hand_api = HandAPI(self.surface_api)
+        # with --pipeline the surface is rebuilt, read and drawn from different threads; they all take this lock
+        self.surface_lock = threading.Lock()
+        self.landmark_source = landmark_source
+        # True on the frame where the hand moved to another camera
+        self.camera_switched = False
+        self.hand_api = HandAPI(self.surface_api, load_model=landmark_source is None, roi_tracking=roi_tracking,
+                                detect_every=detect_every, adaptive_detection=adaptive_detection,
+                                backend=hand_backend, max_hands=max_hands)
         self.hand_api.image_width = self.width
         self.hand_api.image_height = self.height
         
-        self.prev_frame = None
+        self.motion = MotionAnalyzer()
+        self.surface_api.motion = self.motion
         self.change_threshold = 30
+        self.grayscale = grayscale
 
         self.flip_matrix = np.array([[-1, 0, self.width - 1], [0, 1, 0]], dtype=np.float32)
 
+        self.frame_timestamp = None
+        self.dropped_frames = 0
+        self.perf = PerfMonitor(enabled=False)
+        # интерфейс можно рисовать и показывать реже, чем обрабатываются кадры; 0 — каждый кадр
+        self.display_fps = 0
+        self.last_display_time = None
+        # без окна: ничего не рисуем и не показываем, только захват, модель, жесты и вывод
+        self.headless = False
+        self.capture_thread = None
+        if threaded_capture:
+            self.capture_thread = CaptureThread(self.source, capture_buffer_size).start()
+
     def is_camera_opened(self):
-        return self.cap.isOpened()
+        if self.capture_thread is not None:
+            return self.capture_thread.is_running()
+        return self.source.is_opened()
+
+    def read_frame(self):
+        if self.capture_thread is not None:
+            success, image, timestamp, self.dropped_frames = self.capture_thread.read()
+        else:
+            success, image, timestamp = self.source.read()
+            if self.landmark_source is not None:
+                self.dropped_frames = self.landmark_source.dropped_frames
+        if success:
+            self.frame_timestamp = timestamp
+        return success, image
 
     def process_frame(self):
-        success, image = self.cap.read()
+        with self.perf.span('capture'):
+            success, image = self.read_frame()
         if not success:
             print("Failed to get frame from camera")
             return None
 
-        image = cv2.warpAffine(image, self.flip_matrix, (self.width, self.height))
+        with self.perf.span('preprocess'):
+            return self.prepare_frame(image)
 
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        image = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
-        
-        if detect_significant_changes(image, self.prev_frame, self.change_threshold):
+    def prepare_frame(self, image):
+        image, gray = self.normalize_frame(image)
+        self.update_surface(image, gray)
+        return image
+
+    def normalize_frame(self, image):
+        if self.source.mirrored:
+            # кадр уже отзеркален в процессе камеры и пришёл одноканальным
+            gray = image
+            if not self.grayscale:
+                image = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+            return image, gray
+        return mirror_frame(image, self.flip_matrix, self.grayscale)
+
+    def update_surface(self, image, gray):
+        self.motion.update(gray)
+        if self.motion.is_significant(self.change_threshold):
             if self.surface_api.is_surface_locked:
                 self.surface_api.is_surface_locked = False
                 print("Significant changes detected. Surface unlocked.")
         
-        self.prev_frame = image.copy()
-        
         if not self.surface_api.is_surface_locked:
             self.surface_api.detect_surface(image)
-        
-        return image
 
     def detect_hand(self, image):
-        return self.hand_api.detect_hand(image)
+        if self.landmark_source is not None:
+            # модель работает в процессах камер, здесь только забираем готовые точки
+            self.camera_switched = self.landmark_source.switched
+            if self.camera_switched:
+                self.hand_api.smoothed_landmarks = None
+            return self.landmark_source.hand_landmarks()
+        with self.perf.span('inference'):
+            return self.hand_api.detect_hand(image)
+
+    def display_frame(self, image):
+        if image.ndim == 2:
+            return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        return image
+
+    def should_render(self):
+        if self.display_fps <= 0:
+            return True
+        now = time.perf_counter()
+        if self.last_display_time is not None and now - self.last_display_time < 1.0 / self.display_fps:
+            return False
+        self.last_display_time = now
+        return True
+
+    def update_interface_state(self, image):
+        # на непоказанных кадрах рисовать не нужно, но выбор половины кольца должен идти каждый кадр
+        self.surface_api.update_overlay_state(image.shape)
 
-    def draw_interface(self, image, state_manager, click_handler):
+    def draw_interface(self, image, state_manager, click_handler, show=True):
         image = self.surface_api.highlight_surface(image)
         self.hand_api.draw_finger_buttons(image)
         
@@ -61,11 +147,32 @@ class VideoProcessor:
         cv2.putText(image, state_manager.current_state, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
         cv2.putText(image, f"Click state: {click_handler.click_state}", (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
         
-        cursor_x, cursor_y = pyautogui.position()
+        cursor_x, cursor_y = self.dispatcher.cursor_position()
         cv2.putText(image, f"Cursor: ({cursor_x}, {cursor_y})", (10, 150), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+
+        if self.perf.enabled and self.perf.show_hud:
+            self.draw_perf_hud(image)
         
+        if show:
+            self.show_frame(image)
+        return image
+
+    def show_frame(self, image):
         cv2.imshow('Hand and Surface Tracking', image)
 
+    def draw_perf_hud(self, image):
+        lines = [f"FPS: {self.perf.fps():.1f}  dropped: {self.dropped_frames}"]
+        for name, stats in self.perf.stage_stats().items():
+            lines.append(f"{name}: {stats['mean_ms']:.1f} ms (p95 {stats['p95_ms']:.1f})")
+        input_stats = self.dispatcher.stats()
+        lines.append(f"input queue: {input_stats['queue_depth']} (max {input_stats['max_depth']}), "
+                     f"coalesced: {input_stats['coalesced']}")
+
+        y = 215
+        for line in lines:
+            cv2.putText(image, line, (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
+            y += 20
+
     def draw_no_hand_message(self, image):
         cv2.putText(image, "No hand detected", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
 
@@ -76,10 +183,17 @@ class VideoProcessor:
         return cv2.waitKey(5) & 0xFF == 27
 
     def release(self):
-        self.cap.release()
-        cv2.destroyAllWindows()
+        if self.capture_thread is not None:
+            self.capture_thread.stop()
+        self.source.release()
+        if self.hand_api.backend is not None:
+            self.hand_api.backend.close()
+        # без окна highgui может быть вообще не собран, и destroyAllWindows бросит исключение
+        if not self.headless:
+            cv2.destroyAllWindows()
 
     def mouse_callback(self, event, x, y, flags, param):
         if event == cv2.EVENT_LBUTTONDOWN:
             self.hand_api.handle_click(x, y)
-            self.surface_api.handle_click(x, y)
\ No newline at end of file
+            with self.surface_lock:
+                self.surface_api.handle_click(x, y)
\ No newline at end of file
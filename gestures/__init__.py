@@ -1,2 +1,5 @@
 from .click_handler import ClickHandler
-from .cursor_control import CursorControl
\ No newline at end of file
+from .cursor_control import CursorControl
+from .cursor_interpolator import CursorInterpolator
+from .action_dispatcher import ActionDispatcher
+from .output_backends import PyAutoGUIBackend, UInputBackend, RecordingBackend, open_output_backend
@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import deque
+import numpy as np
+from .output_backends import PyAutoGUIBackend
+
+MOVE = 'move'
+
+class ActionDispatcher:
+    # deque append/popleft are atomic, so the frame loop never takes a lock to queue an action
+    def __init__(self, backend=None, threaded=True, stats_window=240):
+        self.backend = backend if backend is not None else PyAutoGUIBackend()
+        self.threaded = threaded
+        self.queue = deque()
+        self.wakeup = threading.Event()
+        self.running = False
+        self.thread = None
+        self.perf = None
+        # last commanded cursor position, so the UI never has to ask the OS where the pointer is
+        self.last_position = None
+
+        self.executed = 0
+        self.coalesced = 0
+        self.max_depth = 0
+        self.waits = deque(maxlen=stats_window)
+
+        self.handlers = {
+            MOVE: self.backend.move_to,
+            'click': self.backend.click,
+            'double_click': self.backend.double_click,
+            'mouse_down': self.backend.mouse_down,
+            'mouse_up': self.backend.mouse_up,
+        }
+
+    def start(self):
+        if self.threaded and self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self._run, name='action-dispatcher', daemon=True)
+            self.thread.start()
+        return self
+
+    def screen_size(self):
+        return self.backend.size()
+
+    def position(self):
+        return self.backend.position()
+
+    def cursor_position(self):
+        if self.last_position is None:
+            self.last_position = tuple(self.backend.position())
+        return self.last_position
+
+    def move_to(self, x, y):
+        self.last_position = (x, y)
+        self.submit(MOVE, x, y)
+
+    def click(self, button='left'):
+        self.submit('click', button)
+
+    def double_click(self):
+        self.submit('double_click')
+
+    def mouse_down(self, button='left'):
+        self.submit('mouse_down', button)
+
+    def mouse_up(self, button='left'):
+        self.submit('mouse_up', button)
+
+    def submit(self, kind, *args):
+        if not self.running:
+            self._execute(kind, args, time.perf_counter())
+            return
+        self.queue.append((kind, args, time.perf_counter()))
+        depth = len(self.queue)
+        if depth > self.max_depth:
+            self.max_depth = depth
+        self.wakeup.set()
+
+    def _run(self):
+        while self.running or self.queue:
+            if not self.queue:
+                self.wakeup.wait(0.1)
+                self.wakeup.clear()
+                continue
+
+            kind, args, queued_at = self.queue.popleft()
+            # only the newest of consecutive moves matters; clicks keep their order
+            while kind == MOVE and self.queue and self.queue[0][0] == MOVE:
+                kind, args, queued_at = self.queue.popleft()
+                self.coalesced += 1
+            self._execute(kind, args, queued_at)
+
+    def _execute(self, kind, args, queued_at):
+        started = time.perf_counter()
+        try:
+            self.handlers[kind](*args)
+        except Exception as e:
+            print(f"Input action {kind} failed: {e}")
+        finished = time.perf_counter()
+
+        self.executed += 1
+        self.waits.append((started - queued_at) * 1000)
+        if self.perf is not None:
+            self.perf.record('input_wait', started - queued_at)
+            self.perf.record('input', finished - started)
+
+    def stats(self):
+        waits = np.array(self.waits) if self.waits else np.zeros(1)
+        return {'queue_depth': len(self.queue), 'max_depth': self.max_depth, 'executed': self.executed,
+                'coalesced': self.coalesced, 'mean_wait_ms': float(waits.mean()), 'max_wait_ms': float(waits.max())}
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        self.wakeup.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def close(self):
+        self.stop()
+        self.backend.close()
@@ -1,7 +1,8 @@
-import pyautogui
+from .action_dispatcher import ActionDispatcher
 
 class ClickHandler:
-    def __init__(self):
+    def __init__(self, dispatcher=None):
+        self.dispatcher = dispatcher if dispatcher is not None else ActionDispatcher(threaded=False)
         self.click_state = "up"
         self.click_cooldown = 0
         self.click_cooldown_threshold = 5
@@ -13,7 +14,7 @@ class ClickHandler:
         elif self.click_state == "down" and current_y < initial_y and self.click_cooldown == 0:
             self.click_state = "up"
             print("Click finished")
-            pyautogui.click()
+            self.dispatcher.click()
             self.click_cooldown = self.click_cooldown_threshold
 
         if self.click_cooldown > 0:
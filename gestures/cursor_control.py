@@ -1,9 +1,11 @@
 import numpy as np
-import pyautogui
 from collections import deque
+from .action_dispatcher import ActionDispatcher
+from .cursor_interpolator import CursorInterpolator
 
 class CursorControl:
-    def __init__(self, screen_width, screen_height):
+    def __init__(self, screen_width, screen_height, dispatcher=None, interpolation_rate=0):
+        self.dispatcher = dispatcher if dispatcher is not None else ActionDispatcher(threaded=False)
         self.screen_width = screen_width
         self.screen_height = screen_height
         
@@ -19,10 +21,11 @@ class CursorControl:
         # Увеличиваем порог минимальной скорости
         self.min_speed = 2.0  # было 1.2
         self.max_speed = 120
-        self.last_cursor_position = pyautogui.position()
+        # позицию курсора спрашиваем у backend'а только при первом движении после сброса
+        self.last_cursor_position = None
         # Уменьшаем фактор ускорения
         self.acceleration_factor = 1.015  # было 1.02
-        self.smooth_x, self.smooth_y = pyautogui.position()
+        self.smooth_x, self.smooth_y = 0, 0
         
         # Увеличиваем минимальное сглаживание
         self.min_smoothing = 0.12  # было 0.08
@@ -36,9 +39,19 @@ class CursorControl:
         # Добавляем порог для игнорирования мелких движений
         self.movement_threshold = 0.8
 
+        # с interpolation_rate > 0 кадры только задают цель, курсор двигает поток с частотой экрана
+        self.interpolator = None
+        if interpolation_rate > 0:
+            self.interpolator = CursorInterpolator(self.dispatcher, screen_width, screen_height,
+                                                   rate=interpolation_rate, momentum=self.momentum,
+                                                   smoothing=self.min_smoothing).start()
+
     def move_cursor(self, index_finger_tip, surface_center, width, height):
         if self.last_finger_position is None:
             self.last_finger_position = index_finger_tip
+            if self.last_cursor_position is None:
+                self.last_cursor_position = tuple(self.dispatcher.position())
+                self.smooth_x, self.smooth_y = self.last_cursor_position
             return
         
         dx = index_finger_tip[0] - self.last_finger_position[0]
@@ -99,14 +112,22 @@ class CursorControl:
         self.smooth_x = max(0, min(self.smooth_x, self.screen_width))
         self.smooth_y = max(0, min(self.smooth_y, self.screen_height))
         
-        pyautogui.moveTo(self.smooth_x, self.smooth_y, duration=0, _pause=False)
+        if self.interpolator is not None:
+            self.interpolator.set_target(self.smooth_x, self.smooth_y)
+        else:
+            self.dispatcher.move_to(self.smooth_x, self.smooth_y)
         self.last_cursor_position = (self.smooth_x, self.smooth_y)
 
     def reset(self):
         self.cursor_position_history.clear()
         self.velocity_history.clear()
         self.last_finger_position = None
-        self.last_cursor_position = pyautogui.position()
-        self.smooth_x, self.smooth_y = self.last_cursor_position
+        self.last_cursor_position = None
         self.last_dx = 0
-        self.last_dy = 0
\ No newline at end of file
+        self.last_dy = 0
+        if self.interpolator is not None:
+            self.interpolator.hold()
+
+    def stop(self):
+        if self.interpolator is not None:
+            self.interpolator.stop()
\ No newline at end of file
@@ -0,0 +1,96 @@
+import threading
+import time
+
+class CursorInterpolator:
+    # camera frames only set the target; the thread moves the pointer toward an extrapolated target at display rate
+    def __init__(self, dispatcher, screen_width, screen_height, rate=120, momentum=0.25, smoothing=0.12,
+                 max_lookahead=0.05, clock=time.perf_counter):
+        self.dispatcher = dispatcher
+        self.screen_width = screen_width
+        self.screen_height = screen_height
+        self.period = 1.0 / rate
+        self.momentum = momentum
+        self.smoothing = smoothing
+        self.max_lookahead = max_lookahead
+        self.clock = clock
+
+        self.target = None
+        self.velocity = (0.0, 0.0)
+        self.frame_interval = 1 / 30
+        self.current = None
+        self.last_emitted = None
+
+        self.running = False
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def start(self):
+        if self.thread is None:
+            self.running = True
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self._run, name='cursor-interpolator', daemon=True)
+            self.thread.start()
+        return self
+
+    def set_target(self, x, y):
+        now = self.clock()
+        target = self.target
+        if target is not None:
+            dt = now - target[2]
+            if dt > 0:
+                vx = (x - target[0]) / dt
+                vy = (y - target[1]) / dt
+                self.velocity = (vx * (1 - self.momentum) + self.velocity[0] * self.momentum,
+                                 vy * (1 - self.momentum) + self.velocity[1] * self.momentum)
+                self.frame_interval = dt
+        # один кортеж, чтобы поток таймера никогда не видел половину обновления
+        self.target = (x, y, now)
+
+    def hold(self, position=None):
+        # рука потеряна: больше не экстраполируем, курсор остаётся на месте
+        self.velocity = (0.0, 0.0)
+        self.target = None
+        if position is not None:
+            self.current = position
+
+    def _run(self):
+        next_tick = self.clock()
+        while self.running:
+            self.tick(next_tick)
+            next_tick += self.period
+            delay = next_tick - self.clock()
+            if delay < 0:
+                # отстали больше чем на тик — не догоняем пачкой движений
+                next_tick = self.clock()
+                delay = 0
+            self.stop_event.wait(delay)
+
+    def tick(self, now):
+        target = self.target
+        if target is None:
+            return
+        x, y, stamp = target
+        vx, vy = self.velocity
+        lookahead = min(max(now - stamp, 0.0), self.frame_interval, self.max_lookahead)
+        goal_x = max(0, min(x + vx * lookahead, self.screen_width))
+        goal_y = max(0, min(y + vy * lookahead, self.screen_height))
+
+        if self.current is None:
+            self.current = (goal_x, goal_y)
+        else:
+            # сглаживание задано на кадр камеры, пересчитываем его на тик таймера
+            keep = self.smoothing ** (self.period / max(self.frame_interval, self.period))
+            self.current = (goal_x + (self.current[0] - goal_x) * keep,
+                            goal_y + (self.current[1] - goal_y) * keep)
+
+        position = (int(round(self.current[0])), int(round(self.current[1])))
+        if position != self.last_emitted:
+            self.last_emitted = position
+            self.dispatcher.move_to(*position)
+
+    def stop(self, timeout=1.0):
+        self.running = False
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
@@ -0,0 +1,137 @@
+import time
+
+class PyAutoGUIBackend:
+    def __init__(self):
+        import pyautogui
+        self.pyautogui = pyautogui
+        pyautogui.FAILSAFE = False
+
+    def size(self):
+        return tuple(self.pyautogui.size())
+
+    def position(self):
+        return tuple(self.pyautogui.position())
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y, duration=0, _pause=False)
+
+    def click(self, button='left'):
+        self.pyautogui.click(button=button)
+
+    def double_click(self):
+        self.pyautogui.doubleClick()
+
+    def mouse_down(self, button='left'):
+        self.pyautogui.mouseDown(button=button)
+
+    def mouse_up(self, button='left'):
+        self.pyautogui.mouseUp(button=button)
+
+    def close(self):
+        pass
+
+class UInputBackend:
+    # a virtual absolute pointer on Linux; events go straight to the kernel without an X11/Quartz round trip
+    def __init__(self, width, height, name='handy-pointer'):
+        from evdev import UInput, AbsInfo, ecodes
+
+        self.ecodes = ecodes
+        self.width = width
+        self.height = height
+        self.buttons = {'left': ecodes.BTN_LEFT, 'right': ecodes.BTN_RIGHT, 'middle': ecodes.BTN_MIDDLE}
+        capabilities = {
+            ecodes.EV_KEY: list(self.buttons.values()),
+            ecodes.EV_ABS: [
+                (ecodes.ABS_X, AbsInfo(value=0, min=0, max=width - 1, fuzz=0, flat=0, resolution=0)),
+                (ecodes.ABS_Y, AbsInfo(value=0, min=0, max=height - 1, fuzz=0, flat=0, resolution=0)),
+            ],
+        }
+        self.device = UInput(capabilities, name=name)
+        # uinput cannot read the pointer back, so the last written position is the position
+        self.current = (width // 2, height // 2)
+
+    def size(self):
+        return self.width, self.height
+
+    def position(self):
+        return self.current
+
+    def move_to(self, x, y):
+        x = min(max(int(x), 0), self.width - 1)
+        y = min(max(int(y), 0), self.height - 1)
+        self.device.write(self.ecodes.EV_ABS, self.ecodes.ABS_X, x)
+        self.device.write(self.ecodes.EV_ABS, self.ecodes.ABS_Y, y)
+        self.device.syn()
+        self.current = (x, y)
+
+    def click(self, button='left'):
+        self.mouse_down(button)
+        self.mouse_up(button)
+
+    def double_click(self):
+        self.click()
+        self.click()
+
+    def mouse_down(self, button='left'):
+        self.device.write(self.ecodes.EV_KEY, self.buttons[button], 1)
+        self.device.syn()
+
+    def mouse_up(self, button='left'):
+        self.device.write(self.ecodes.EV_KEY, self.buttons[button], 0)
+        self.device.syn()
+
+    def close(self):
+        self.device.close()
+
+class RecordingBackend:
+    # keeps (timestamp, action, args) in memory instead of touching the OS; with record=False it is a null sink
+    def __init__(self, width=1920, height=1080, record=True, clock=time.perf_counter):
+        self.width = width
+        self.height = height
+        self.record = record
+        self.clock = clock
+        self.actions = []
+        self.current = (width // 2, height // 2)
+
+    def size(self):
+        return self.width, self.height
+
+    def position(self):
+        return self.current
+
+    def log(self, action, *args):
+        if self.record:
+            self.actions.append((self.clock(), action, args))
+
+    def move_to(self, x, y):
+        self.current = (x, y)
+        self.log('move', x, y)
+
+    def click(self, button='left'):
+        self.log('click', button)
+
+    def double_click(self):
+        self.log('double_click')
+
+    def mouse_down(self, button='left'):
+        self.log('mouse_down', button)
+
+    def mouse_up(self, button='left'):
+        self.log('mouse_up', button)
+
+    def clear(self):
+        self.actions.clear()
+
+    def close(self):
+        pass
+
+def open_output_backend(name, screen_size=None):
+    if name == 'pyautogui':
+        return PyAutoGUIBackend()
+    if name == 'uinput':
+        if screen_size is None:
+            raise ValueError("The uinput backend needs the screen size (--screen-size WIDTHxHEIGHT)")
+        return UInputBackend(*screen_size)
+    if name in ('record', 'null'):
+        return RecordingBackend(*(screen_size or (1920, 1080)), record=name == 'record')
+    raise ValueError(f"Unknown output backend: {name}")
@@ -1,8 +1,13 @@
+import argparse
+import collections
 import cv2
 import signal
 import sys
-from core import VideoProcessor, StateManager
-from gestures import CursorControl, ClickHandler
+import threading
+from core import VideoProcessor, StateManager, FramePipeline, CameraSupervisor, open_source
+from core import LandmarkRecorder, LandmarkRecording, LandmarkReplay, PerfMonitor, PerfSink, DEFAULT_GESTURE_RULES
+from gestures import CursorControl, ClickHandler, ActionDispatcher, open_output_backend
+from api import HandLandmarkerBackend
 from additional.utils import setup_window
 
 def signal_handler(sig, frame):
@@ -10,40 +15,281 @@ def signal_handler(sig, frame):
     cv2.destroyAllWindows()
     sys.exit(0)
 
+def install_stop_handlers(stop_event):
+    # в режиме без окна нет waitKey, поэтому остановка приходит только сигналом
+    def request_stop(sig, frame):
+        print(f'\nStopping ({signal.Signals(sig).name})')
+        stop_event.set()
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+
+def parse_screen_size(value):
+    try:
+        width, height = (int(v) for v in value.lower().split('x'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected WIDTHxHEIGHT, got {value}")
+    return width, height
+
+def positive_int(value):
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value}")
+    return number
+
+def positive_float(value):
+    try:
+        number = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a positive number, got {value}")
+    if not 0 < number < float('inf'):
+        raise argparse.ArgumentTypeError(f"expected a positive number, got {value}")
+    return number
+
+def camera_worker_options(args):
+    return {
+        'realtime': not args.fast_replay, 'fps': args.source_fps, 'grayscale': args.grayscale,
+        'max_hands': args.max_hands, 'roi_tracking': args.roi_tracking, 'detect_every': args.detect_every,
+        'adaptive_detection': args.adaptive_detection, 'backend': args.backend,
+        'landmarker_model': args.landmarker_model, 'delegate': args.delegate, 'max_in_flight': args.max_in_flight,
+    }
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='handy')
+    parser.add_argument('--source', default='0',
+                        help='camera index, video file or directory of images')
+    parser.add_argument('--cameras', nargs='+', metavar='SOURCE',
+                        help='run capture and the hand model for each source in its own process and merge them, '
+                             'the first source preferred; replaces --source')
+    parser.add_argument('--handoff-frames', type=int, default=5,
+                        help='frames the followed camera must miss the hand before another camera takes over')
+    parser.add_argument('--fast-replay', action='store_true',
+                        help='replay file sources as fast as possible instead of at native speed')
+    parser.add_argument('--source-fps', type=float, default=30.0,
+                        help='frame rate assumed for a directory of images')
+    parser.add_argument('--threaded-capture', action='store_true',
+                        help='read the camera on a separate thread and always process the newest frame')
+    parser.add_argument('--capture-buffer', type=int, default=2,
+                        help='number of frames kept by the capture thread')
+    parser.add_argument('--grayscale', action='store_true',
+                        help='keep frames single-channel through preprocessing and surface detection')
+    parser.add_argument('--roi-tracking', action='store_true',
+                        help='run hand inference on a crop around the last detected hand')
+    parser.add_argument('--detect-every', type=int, default=1,
+                        help='run the hand model every N frames and predict landmarks in between')
+    parser.add_argument('--adaptive-detection', action='store_true',
+                        help='choose the detection interval from hand speed')
+    parser.add_argument('--backend', choices=['solutions', 'tasks'], default='solutions',
+                        help='hand model: legacy mp.solutions.hands or the asynchronous Tasks HandLandmarker')
+    parser.add_argument('--landmarker-model', default='models/hand_landmarker.task',
+                        help='model bundle for the Tasks backend')
+    parser.add_argument('--delegate', choices=['cpu', 'gpu'], default='cpu',
+                        help='inference delegate for the Tasks backend')
+    parser.add_argument('--max-in-flight', type=int, default=2,
+                        help='frames the Tasks backend may have submitted without a result yet')
+    parser.add_argument('--max-hands', type=int, default=1,
+                        help='track up to N hands, each with its own gesture state; the oldest one moves the cursor')
+    parser.add_argument('--surface-detect-every', type=positive_int, default=1,
+                        help='search for the surface every N frames while it is unlocked')
+    parser.add_argument('--surface-scale', type=positive_float, default=1.0,
+                        help='downscale factor for the surface search, e.g. 0.5 for half resolution')
+    parser.add_argument('--display-fps', type=float, default=0,
+                        help='draw and show the interface at most this often, 0 shows every processed frame')
+    parser.add_argument('--headless', action='store_true',
+                        help='run without a window: no drawing, no display, stop with SIGINT or SIGTERM')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='run preprocessing, inference, gestures and rendering as separate pipeline stages')
+    parser.add_argument('--queue-size', type=int, default=2,
+                        help='capacity of the queues between pipeline stages')
+    parser.add_argument('--record-landmarks', metavar='PATH',
+                        help='write the detected hand landmarks of every frame to a recording')
+    parser.add_argument('--replay-landmarks', metavar='PATH',
+                        help='run the gesture logic over a landmark recording without camera or model')
+    parser.add_argument('--gesture-rules', metavar='PATH', default=DEFAULT_GESTURE_RULES,
+                        help='json file with the gesture rule set')
+    parser.add_argument('--output', choices=['pyautogui', 'uinput', 'null', 'record'],
+                        help='where mouse actions go: pyautogui, a Linux uinput device, nowhere or an in-memory log '
+                             '(default: pyautogui, record for --replay-landmarks)')
+    parser.add_argument('--screen-size', type=parse_screen_size, metavar='WxH',
+                        help='screen resolution, required by the uinput output')
+    parser.add_argument('--cursor-rate', type=float, default=0,
+                        help='move the cursor at this rate (Hz) between camera frames, 0 moves it once per frame')
+    parser.add_argument('--perf-hud', action='store_true',
+                        help='show fps, per-stage timings and dropped frames on screen')
+    parser.add_argument('--perf-log', metavar='PATH',
+                        help='write per-frame stage timings to a .csv or .jsonl file')
+    return parser.parse_args()
+
 def main():
-    signal.signal(signal.SIGINT, signal_handler)
+    args = parse_args()
+    stop_event = threading.Event()
+    if args.headless:
+        install_stop_handlers(stop_event)
+    else:
+        signal.signal(signal.SIGINT, signal_handler)
 
-    video_processor = VideoProcessor()
-    state_manager = StateManager()
-    cursor_control = CursorControl(*video_processor.screen_size)
-    click_handler = ClickHandler()
+    if args.replay_landmarks:
+        run_landmark_replay(args.replay_landmarks, args.gesture_rules, args.output or 'record', args.screen_size)
+        return
 
-    setup_window(video_processor.mouse_callback)
+    if args.max_hands > 1 and args.record_landmarks:
+        raise ValueError("Landmark recordings hold one hand per frame; record with --max-hands 1")
+
+    if args.cameras and (args.pipeline or args.threaded_capture):
+        raise ValueError("--cameras already captures and runs the model in worker processes; "
+                         "drop --pipeline and --threaded-capture")
+
+    hand_backend = None
+    if args.backend == 'tasks' and not args.cameras:
+        hand_backend = HandLandmarkerBackend(args.landmarker_model, num_hands=args.max_hands, delegate=args.delegate,
+                                             max_in_flight=args.max_in_flight)
+
+    # mouse actions run on their own thread so the frame loop never waits on the OS input layer
+    dispatcher = ActionDispatcher(open_output_backend(args.output or 'pyautogui', args.screen_size)).start()
+
+    if args.cameras:
+        # захват и модель работают в отдельном процессе на каждую камеру, здесь остаются поверхность, жесты и вывод
+        supervisor = CameraSupervisor(args.cameras, options=camera_worker_options(args),
+                                      handoff_frames=args.handoff_frames).start()
+        video_processor = VideoProcessor(supervisor, grayscale=args.grayscale, dispatcher=dispatcher,
+                                         max_hands=args.max_hands, landmark_source=supervisor)
+    else:
+        source = open_source(args.source, realtime=not args.fast_replay, fps=args.source_fps)
+        video_processor = VideoProcessor(source, threaded_capture=args.threaded_capture,
+                                         capture_buffer_size=args.capture_buffer, grayscale=args.grayscale,
+                                         roi_tracking=args.roi_tracking, detect_every=args.detect_every,
+                                         adaptive_detection=args.adaptive_detection, hand_backend=hand_backend,
+                                         dispatcher=dispatcher, max_hands=args.max_hands)
+    video_processor.display_fps = args.display_fps
+    video_processor.headless = args.headless
+    video_processor.surface_api.detect_every = args.surface_detect_every
+    video_processor.surface_api.detection_scale = args.surface_scale
+    state_manager = StateManager(gesture_rules=args.gesture_rules, dispatcher=dispatcher, max_hands=args.max_hands)
+    cursor_control = CursorControl(*video_processor.screen_size, dispatcher=dispatcher,
+                                   interpolation_rate=args.cursor_rate)
+    click_handler = ClickHandler(dispatcher=dispatcher)
+
+    if args.perf_hud or args.perf_log:
+        sink = PerfSink(args.perf_log) if args.perf_log else None
+        video_processor.perf = PerfMonitor(sink=sink, show_hud=args.perf_hud)
+        dispatcher.perf = video_processor.perf
+
+    recorder = None
+    if args.record_landmarks:
+        recorder = LandmarkRecorder(args.record_landmarks, video_processor.width, video_processor.height)
+
+    if not args.headless:
+        setup_window(video_processor.mouse_callback)
 
     try:
-        while video_processor.is_camera_opened():
-            image = video_processor.process_frame()
-            if image is None:
-                continue
+        if args.pipeline:
+            run_pipelined(video_processor, state_manager, cursor_control, click_handler, args.queue_size, recorder,
+                          stop_event)
+        else:
+            run_sequential(video_processor, state_manager, cursor_control, click_handler, recorder, stop_event)
+    except KeyboardInterrupt:
+        print('\nПрограмма остановлена (Control+C)')
+    finally:
+        if recorder is not None:
+            recorder.close()
+        cursor_control.stop()
+        dispatcher.close()
+        video_processor.perf.close()
+        video_processor.release()
+
+def run_sequential(video_processor, state_manager, cursor_control, click_handler, recorder=None, stop_event=None):
+    perf = video_processor.perf
+    headless = video_processor.headless
+    while video_processor.is_camera_opened() and not (stop_event is not None and stop_event.is_set()):
+        image = video_processor.process_frame()
+        if image is None:
+            continue
+
+        hand_landmarks = video_processor.detect_hand(image)
+        if video_processor.camera_switched:
+            state_manager.clear()
+            cursor_control.reset()
+        # асинхронная модель могла ещё не ответить: такой кадр не сбрасывает жесты и не пишется в запись
+        new_result = video_processor.hand_api.new_result
+        if recorder is not None and new_result:
+            recorder.record_frame(video_processor.frame_timestamp, hand_landmarks, video_processor.surface_api)
+        if headless:
+            with perf.span('gesture'):
+                if hand_landmarks is not None:
+                    state_manager.process_hand(None, hand_landmarks, video_processor, cursor_control, click_handler)
+                elif new_result:
+                    state_manager.reset()
+                    cursor_control.reset()
+            # выбор половины кольца нужен и без отрисовки: от него зависит поиск поверхности
+            video_processor.update_interface_state(image)
+            perf.end_frame(video_processor.dropped_frames)
+            continue
 
-            hand_landmarks = video_processor.detect_hand(image)
-            if hand_landmarks:
+        image = video_processor.display_frame(image)
+        with perf.span('gesture'):
+            if hand_landmarks is not None:
                 image = state_manager.process_hand(image, hand_landmarks, video_processor, cursor_control, click_handler)
-            else:
+            elif new_result:
                 state_manager.reset()
                 cursor_control.reset()
                 video_processor.draw_no_hand_message(image)
 
-            video_processor.draw_interface(image, state_manager, click_handler)
-            
-            if video_processor.should_exit():
+        with perf.span('render'):
+            rendered = video_processor.should_render()
+            if rendered:
+                video_processor.draw_interface(image, state_manager, click_handler, show=False)
+            else:
+                video_processor.update_interface_state(image)
+
+        exit_requested = False
+        if rendered:
+            with perf.span('display'):
+                video_processor.show_frame(image)
+                exit_requested = video_processor.should_exit()
+        perf.end_frame(video_processor.dropped_frames)
+
+        if exit_requested:
+            break
+
+def run_pipelined(video_processor, state_manager, cursor_control, click_handler, queue_size, recorder=None,
+                  stop_event=None):
+    pipeline = FramePipeline(video_processor, state_manager, cursor_control, click_handler,
+                             queue_size, recorder, stop_event).start()
+    try:
+        perf = video_processor.perf
+        for packet in pipeline.results():
+            exit_requested = False
+            if packet.rendered:
+                with perf.span('display'):
+                    video_processor.show_frame(packet.image)
+                    exit_requested = video_processor.should_exit()
+            perf.end_frame(video_processor.dropped_frames)
+            if exit_requested:
                 break
+    finally:
+        pipeline.stop()
 
-    except KeyboardInterrupt:
-        print('\nПрограмма остановлена (Control+C)')
+def run_landmark_replay(path, gesture_rules, output='record', screen_size=None):
+    recording = LandmarkRecording(path)
+    replay = LandmarkReplay(recording)
+    # по умолчанию повтор не двигает настоящий курсор, действия только записываются
+    backend = open_output_backend(output, screen_size)
+    dispatcher = ActionDispatcher(backend, threaded=False)
+    state_manager = StateManager(gesture_rules=gesture_rules, dispatcher=dispatcher)
+    cursor_control = CursorControl(*dispatcher.screen_size(), dispatcher=dispatcher)
+    click_handler = ClickHandler(dispatcher=dispatcher)
+
+    try:
+        frames, elapsed = replay.run(state_manager, cursor_control, click_handler)
     finally:
-        video_processor.release()
-        cv2.destroyAllWindows()
+        dispatcher.close()
+    fps = frames / elapsed if elapsed > 0 else 0
+    print(f"Replayed {frames} frames in {elapsed:.2f}s ({fps:.0f} fps)")
+    if output == 'record':
+        counts = collections.Counter(action for _, action, _ in backend.actions)
+        print("Actions: " + (", ".join(f"{action} {count}" for action, count in sorted(counts.items())) or "none"))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,125 @@
+import pytest
+from core.gesture_features import FEATURES
+from core.gesture_rules import GestureRules
+
+def make_rules(gestures, constants=None, groups=None, actions=None):
+    spec = {'constants': constants or {}, 'groups': groups or {}, 'gestures': gestures}
+    return GestureRules(spec, actions or {})
+
+def features(rules, **values):
+    # fills the rules' own vector like GestureFeatures.extract; the cooldown counters live at its tail
+    vector = rules.features.vector
+    vector[:len(FEATURES)] = 0
+    for name, value in values.items():
+        vector[rules.features.index[name]] = value
+    return vector
+
+def fired(rules, **values):
+    return [rules.names[i] for i in rules.match(features(rules, **values))]
+
+def test_rules_are_ordered_by_priority_then_file_order():
+    rules = make_rules([
+        {'name': 'late', 'priority': 20, 'when': [['movement', '>', 1]]},
+        {'name': 'first_tie', 'priority': 10, 'when': [['movement', '>', 1]]},
+        {'name': 'second_tie', 'priority': 10, 'when': [['movement', '>', 1]]},
+    ])
+    assert rules.names == ['first_tie', 'second_tie', 'late']
+
+def test_exclusive_rule_suppresses_lower_priority():
+    rules = make_rules([
+        {'name': 'low', 'priority': 20, 'when': [['movement', '>', 1]]},
+        {'name': 'high', 'priority': 10, 'when': [['movement', '>', 5]]},
+    ])
+    assert fired(rules, movement=10) == ['high']
+    # when the higher one does not match, the lower one is free to fire
+    assert fired(rules, movement=3) == ['low']
+
+def test_non_exclusive_rule_lets_others_fire():
+    rules = make_rules([
+        {'name': 'track', 'priority': 10, 'exclusive': False, 'emit': None, 'when': [['movement', '>', 1]]},
+        {'name': 'gesture', 'priority': 20, 'when': [['movement', '>', 1]]},
+    ])
+    assert fired(rules, movement=2) == ['track', 'gesture']
+    assert rules.emits == [None, 'gesture']
+
+def test_excludes_is_symmetric():
+    rules = make_rules([
+        {'name': 'a', 'priority': 10, 'exclusive': False, 'when': [['movement', '>', 1]]},
+        {'name': 'b', 'priority': 20, 'exclusive': False, 'excludes': ['a'], 'when': [['movement', '>', 1]]},
+        {'name': 'c', 'priority': 30, 'exclusive': False, 'when': [['movement', '>', 1]]},
+    ])
+    # b names a, but a is higher priority, so a wins and b is dropped; c is not involved
+    assert fired(rules, movement=2) == ['a', 'c']
+    assert rules.exclusions[0, 1] and rules.exclusions[1, 0]
+
+def test_cooldown_blocks_until_counted_down():
+    rules = make_rules([
+        {'name': 'click', 'cooldown': 3, 'when': [['movement', '>', 1]]},
+    ])
+    assert fired(rules, movement=2) == ['click']
+    for _ in range(3):
+        assert fired(rules, movement=2) == []
+        rules.update_cooldowns()
+    assert fired(rules, movement=2) == ['click']
+
+def test_cooldown_group_is_shared():
+    rules = make_rules([
+        {'name': 'left', 'priority': 10, 'cooldown': 2, 'cooldown_group': 'rotate',
+         'when': [['index_x_travel', '<', -1]]},
+        {'name': 'right', 'priority': 10, 'cooldown': 2, 'cooldown_group': 'rotate',
+         'when': [['index_x_travel', '>', 1]]},
+    ])
+    assert rules.cooldown_groups == ['rotate']
+    assert fired(rules, index_x_travel=-5) == ['left']
+    assert fired(rules, index_x_travel=5) == []
+    rules.update_cooldowns()
+    rules.update_cooldowns()
+    assert fired(rules, index_x_travel=5) == ['right']
+
+def test_reset_clears_cooldowns_and_streaks():
+    rules = make_rules([
+        {'name': 'click', 'cooldown': 5, 'when': [['movement', '>', 1]]},
+        {'name': 'hold', 'window': 3, 'when': [['hold_elapsed', '>', 1]]},
+    ])
+    assert fired(rules, movement=2, hold_elapsed=2) == ['click']
+    assert fired(rules, hold_elapsed=2) == []
+    rules.reset()
+    assert fired(rules, movement=2) == ['click']
+    assert rules.streaks.tolist() == [0, 0]
+
+def test_window_needs_consecutive_frames():
+    rules = make_rules([
+        {'name': 'hold', 'window': 3, 'when': [['hold_elapsed', '>', 1]]},
+    ])
+    assert fired(rules, hold_elapsed=2) == []
+    assert fired(rules, hold_elapsed=2) == []
+    assert fired(rules, hold_elapsed=0) == []
+    assert fired(rules, hold_elapsed=2) == []
+    assert fired(rules, hold_elapsed=2) == []
+    assert fired(rules, hold_elapsed=2) == ['hold']
+
+def test_operators_constants_groups_and_alternatives():
+    rules = make_rules(
+        [{'name': 'tap', 'use': ['still'],
+          'any': [[['index_y_change', '>=', '$threshold']], [['index_y_change', '<=', '-$threshold']]]}],
+        constants={'threshold': 4},
+        groups={'still': [['movement', '<', 2], ['size_stable', '==', 1]]},
+    )
+    assert fired(rules, index_y_change=4, size_stable=1) == ['tap']
+    assert fired(rules, index_y_change=-4, size_stable=1) == ['tap']
+    assert fired(rules, index_y_change=3.9, size_stable=1) == []
+    assert fired(rules, index_y_change=4, size_stable=0) == []
+    assert fired(rules, index_y_change=4, size_stable=1, movement=2) == []
+
+@pytest.mark.parametrize('gestures, message', [
+    ([{'name': 'a'}, {'name': 'a'}], 'unique'),
+    ([{'name': 'a', 'when': [['no_such_feature', '>', 0]]}], 'unknown feature'),
+    ([{'name': 'a', 'when': [['movement', '!=', 0]]}], 'unknown operator'),
+    ([{'name': 'a', 'excludes': ['b']}], 'excludes unknown rule'),
+    ([{'name': 'a', 'use': ['missing']}], 'unknown group'),
+    ([{'name': 'a', 'when': [['movement', '>', '$missing']]}], 'Unknown gesture constant'),
+    ([{'name': 'a', 'action': 'missing'}], 'unknown action'),
+])
+def test_invalid_rule_sets_are_rejected(gestures, message):
+    with pytest.raises(ValueError, match=message):
+        make_rules(gestures)
@@ -0,0 +1,86 @@
+import numpy as np
+from api import SurfaceAPI
+from core import LandmarkRecorder, LandmarkRecording, LandmarkReplay, StateManager
+from gestures import ActionDispatcher, RecordingBackend, CursorControl, ClickHandler
+from benchmarks.fixtures import CANONICAL_HAND
+
+WIDTH, HEIGHT = 640, 480
+
+def locked_surface():
+    surface_api = SurfaceAPI()
+    surface_api.is_surface_locked = True
+    surface_api.surface_contour = np.array([[0, 0], [WIDTH, 0], [WIDTH, HEIGHT], [0, HEIGHT]],
+                                           dtype=np.int32).reshape(-1, 1, 2)
+    return surface_api
+
+def tap_landmarks(count=60, tap_at=30):
+    # открытая ладонь стоит на месте, на кадре tap_at кончик указательного пальца делает один тап
+    landmarks = np.repeat(CANONICAL_HAND[None], count, axis=0)
+    for phase in range(4):
+        landmarks[tap_at + phase, 8, 1] += 0.12 * (1 - abs(phase - 1.5) / 1.5)
+    return landmarks
+
+def write_recording(path, landmarks):
+    surface_api = locked_surface()
+    recorder = LandmarkRecorder(str(path), WIDTH, HEIGHT)
+    for i, hand_landmarks in enumerate(landmarks):
+        recorder.record_frame(i / 30.0, hand_landmarks, surface_api)
+    # the hand leaves at the end
+    recorder.record_frame(len(landmarks) / 30.0, None, surface_api)
+    recorder.close()
+
+def replay(path, capsys):
+    backend = RecordingBackend(1920, 1080)
+    dispatcher = ActionDispatcher(backend, threaded=False)
+    state_manager = StateManager(dispatcher=dispatcher)
+    cursor_control = CursorControl(*dispatcher.screen_size(), dispatcher=dispatcher)
+    click_handler = ClickHandler(dispatcher=dispatcher)
+
+    capsys.readouterr()
+    frames, _ = LandmarkReplay(LandmarkRecording(str(path))).run(state_manager, cursor_control, click_handler)
+    dispatcher.close()
+    gestures = capsys.readouterr().out.splitlines()
+    actions = [(action, args) for _, action, args in backend.actions]
+    return frames, gestures, actions, state_manager
+
+def test_recording_round_trip(tmp_path):
+    landmarks = tap_landmarks()
+    write_recording(tmp_path / 'tap.hlm', landmarks)
+
+    recording = LandmarkRecording(str(tmp_path / 'tap.hlm'))
+    assert (recording.width, recording.height) == (WIDTH, HEIGHT)
+    assert len(recording) == len(landmarks) + 1
+    np.testing.assert_array_equal(recording.landmarks[:len(landmarks)], landmarks)
+    assert np.isnan(recording.landmarks[-1]).all()
+    assert recording.surface_locked.all()
+    assert recording.surface_contour is not None
+
+def test_replay_emits_tap_gestures_and_actions(tmp_path, capsys):
+    write_recording(tmp_path / 'tap.hlm', tap_landmarks())
+    frames, gestures, actions, state_manager = replay(tmp_path / 'tap.hlm', capsys)
+
+    assert frames == 61
+    # the tap clicks while it is in the history window, then the still finger turns into a hold
+    assert gestures == ['Click with Index Finger', 'Click with Index Finger', 'Index Hold']
+    assert [item for item in actions if item[0] != 'move'] == [
+        ('click', ('left',)), ('click', ('left',)), ('mouse_down', ('left',)),
+    ]
+    first_click = next(i for i, item in enumerate(actions) if item[0] == 'click')
+    assert first_click > 0 and all(action == 'move' for action, _ in actions[:first_click])
+    # the frame without a hand resets the gesture state
+    assert state_manager.current_state == "Initializing"
+    assert state_manager.gesture.index_hold_start_time is None
+
+def test_replay_is_deterministic(tmp_path, capsys):
+    write_recording(tmp_path / 'tap.hlm', tap_landmarks())
+    first = replay(tmp_path / 'tap.hlm', capsys)
+    second = replay(tmp_path / 'tap.hlm', capsys)
+    assert first[1] == second[1]
+    assert first[2] == second[2]
+
+def test_replay_without_taps_only_moves(tmp_path, capsys):
+    still = np.repeat(CANONICAL_HAND[None], 40, axis=0)
+    write_recording(tmp_path / 'still.hlm', still)
+    _, gestures, actions, _ = replay(tmp_path / 'still.hlm', capsys)
+    assert gestures == []
+    assert {action for action, _ in actions} <= {'move'}
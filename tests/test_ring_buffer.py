@@ -0,0 +1,70 @@
+import numpy as np
+from core.ring_buffer import RingBuffer
+
+def test_view_before_wraparound():
+    buffer = RingBuffer(4)
+    for value in (1, 2, 3):
+        buffer.append(value)
+    assert len(buffer) == 3
+    assert not buffer.is_full()
+    np.testing.assert_array_equal(buffer.view(), [1, 2, 3])
+    assert buffer.oldest() == 1
+    assert buffer.newest() == 3
+
+def test_view_stays_contiguous_after_wraparound():
+    buffer = RingBuffer(4)
+    for value in range(1, 11):
+        buffer.append(value)
+        expected = list(range(max(1, value - 3), value + 1))
+        view = buffer.view()
+        assert view.base is buffer.data
+        np.testing.assert_array_equal(view, expected)
+        assert buffer.oldest() == expected[0]
+        assert buffer.newest() == expected[-1]
+    assert buffer.is_full()
+    assert list(buffer) == [7, 8, 9, 10]
+
+def test_vector_samples():
+    buffer = RingBuffer(3, shape=(2,))
+    for i in range(5):
+        buffer.append((i, -i))
+    np.testing.assert_array_equal(buffer.view(), [[2, -2], [3, -3], [4, -4]])
+    np.testing.assert_array_equal(buffer.newest(), [4, -4])
+
+def test_running_sum_matches_window():
+    rng = np.random.default_rng(0)
+    buffer = RingBuffer(5, track_sum=True)
+    values = rng.normal(0, 100, 23)
+    for i, value in enumerate(values):
+        buffer.append(value)
+        window = values[max(0, i - 4):i + 1]
+        assert np.isclose(buffer.sum, window.sum())
+        assert np.isclose(buffer.mean(), window.mean())
+
+def test_running_sum_resyncs_every_lap():
+    buffer = RingBuffer(4, track_sum=True)
+    # big values that cancel leave float error in a pure running sum
+    for value in (1e16, 1.0, -1e16, 1.0) * 3:
+        buffer.append(value)
+    # the head is back at 0, so the sum was recomputed from the window
+    assert buffer.head == 0
+    assert buffer.sum == np.sum(buffer.view())
+
+def test_vector_running_sum():
+    buffer = RingBuffer(3, shape=(2,), track_sum=True)
+    for i in range(7):
+        buffer.append((i, 2 * i))
+    np.testing.assert_allclose(buffer.sum, [4 + 5 + 6, 2 * (4 + 5 + 6)])
+    np.testing.assert_allclose(buffer.mean(), [5, 10])
+
+def test_clear():
+    buffer = RingBuffer(3, track_sum=True)
+    for value in range(5):
+        buffer.append(value)
+    buffer.clear()
+    assert len(buffer) == 0
+    assert buffer.sum == 0
+    assert len(buffer.view()) == 0
+    buffer.append(7)
+    np.testing.assert_array_equal(buffer.view(), [7])
+    assert buffer.sum == 7